@@ -1,9 +1,21 @@
 ''' AWS Client Interface '''
-import boto3
+import threading
+import http.client
+from models.httpResponse import HttpResponse
 from modules.comment_operations import get_last_comment, append_new_comments, save_comment_to_file
 from modules.utils import INFO_TAG, WARNING_TAG, ERROR_LINE, SUCCESS_LINE, print_key_value_list
 from models.exceptions import ApproveSameUserAsCreated
-from botocore.exceptions import ClientError
+
+# CodeCommit clients by ( region, access key id, secret access key ), boto3 client creation
+# loads the service models from disk, so each one is created once per process
+CODECOMMIT_CLIENTS		= {}
+CODECOMMIT_CLIENTS_LOCK	= threading.Lock()
+
+def get_http_response(response):
+	''' HttpResponse with the HTTP status of a boto3 response, like the ones of the other git servers '''
+	statusCode	= response[ 'ResponseMetadata' ][ 'HTTPStatusCode' ]
+	reason		= http.client.responses.get( statusCode, '' )
+	return HttpResponse( statusCode, reason, reason, response, response[ 'ResponseMetadata' ].get( 'HTTPHeaders' ) )
 
 class awsCloud():
 	def __init__(self, host, region, repository):
@@ -25,18 +37,23 @@ class awsCloud():
 		:type aws_access_key_id: str
 		:param aws_secret_access_key: AWS secret access key.
 		:type aws_secret_access_key: str
-		:return: CodeCommit client.
+		:return: CodeCommit client, shared by every call with the same region and credentials.
 		:rtype: boto3.client
 		"""
-		# Create a client to interact with the CodeCommit service
-		client = boto3.client(
-			'codecommit',
-			region_name=region,
-			aws_access_key_id=aws_access_key_id,
-			aws_secret_access_key=aws_secret_access_key
-		)
-		
-		return client
+		clientKey = ( region, aws_access_key_id, aws_secret_access_key )
+		with CODECOMMIT_CLIENTS_LOCK:
+			if not clientKey in CODECOMMIT_CLIENTS:
+				# boto3 is imported on first use, so other git servers never load it
+				import boto3
+
+				# Create a client to interact with the CodeCommit service
+				CODECOMMIT_CLIENTS[ clientKey ] = boto3.client(
+					'codecommit',
+					region_name=region,
+					aws_access_key_id=aws_access_key_id,
+					aws_secret_access_key=aws_secret_access_key
+				)
+			return CODECOMMIT_CLIENTS[ clientKey ]
 
 
 	def add_comment(self, sslVerify, token, pullRequestId, newComments, buildId, workspace, **kwargs):
@@ -57,6 +74,8 @@ class awsCloud():
 		:type workspace: str
 		:param kwargs: Additional arguments.
 		:type kwargs: dict
+		:return: Response of the comment creation.
+		:rtype: HttpResponse
 		"""
 		# Get AWS credentials from token
 		aws_access_key_id, aws_secret_access_key = self.get_aws_credentials_from_token(token)
@@ -87,6 +106,7 @@ class awsCloud():
 			print(f'{SUCCESS_LINE} Comment created succesfully with id \'{commentId}\', saved to ./{buildId}-comment.txt')
 		else:
 			print(f'{ERROR_LINE} Could not create comment on pull request ({pull_request_id} -- {response["ResponseMetadata"]["HTTPStatusCode"]})')
+		return get_http_response(response)
 
 	def edit_comment(self, sslVerify, token, pullRequestId, newComments, buildId, workspace, **kwargs):
 		"""
@@ -106,6 +126,8 @@ class awsCloud():
 			:type workspace: str
 			:param kwargs: Additional arguments.
 			:type kwargs: dict
+			:return: Response of the comment update.
+			:rtype: HttpResponse
 		"""
 		# Get the ID and content of the latest comment
 		commentId, lastComments = get_last_comment(workspace, buildId)
@@ -146,6 +168,7 @@ class awsCloud():
 			print(f'{SUCCESS_LINE} Comment created succesfully with id \'{commentId}\', saved to ./{buildId}-comment.txt')
 		else:
 			print(f'{ERROR_LINE} Could not create comment on pull request ({pull_request_id} -- {response["ResponseMetadata"]["HTTPStatusCode"]})')
+		return get_http_response(response)
 
 	def approve_pull_request(self, sslVerify, token, pullRequest_Id, userSlug, **kwargs):
 		"""
@@ -161,7 +184,11 @@ class awsCloud():
 		:type userSlug: str
 		:param kwargs: Additional arguments.
 		:type kwargs: dict
+		:return: Response of the approval.
+		:rtype: HttpResponse
 		"""
+		from botocore.exceptions import ClientError
+
 		# Get AWS credentials from token
 		aws_access_key_id, aws_secret_access_key = self.get_aws_credentials_from_token(token)
 		
@@ -200,7 +227,8 @@ class awsCloud():
 		if response['ResponseMetadata']['HTTPStatusCode'] == 200:
 			print(f'{SUCCESS_LINE} Pull request approved successfully id {pullRequest_Id}')
 		else:
-			print(f'{ERROR_LINE} Could not approve pull request ({pullRequest_Id} -- {response.statusCode})')
+			print(f'{ERROR_LINE} Could not approve pull request ({pullRequest_Id} -- {response["ResponseMetadata"]["HTTPStatusCode"]})')
+		return get_http_response(response)
 
 	def get_pull_request_info(self, pull_request_id, region, aws_access_key_id, aws_secret_access_key):
 		"""
@@ -217,6 +245,8 @@ class awsCloud():
 		:return: Pull request information.
 		:rtype: dict
 		"""
+		from botocore.exceptions import ClientError
+
 		try:
     		# Create a client to interact with the CodeCommit service
 			client = self.create_codecommit_client(region, aws_access_key_id, aws_secret_access_key)
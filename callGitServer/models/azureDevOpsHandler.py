@@ -15,7 +15,7 @@ class AzureDevOpsHandler():
 
 
 	def add_comment(self, sslVerify, token, pullRequestId, commentBody, buildId, workspace, **kwargs):
-		self.create_thread(sslVerify, token, pullRequestId, commentBody, **kwargs)
+		return self.create_thread(sslVerify, token, pullRequestId, commentBody, **kwargs)
 
 
 	def create_thread(self, sslVerify, token, pullRequestId, commentBody, **kwargs):
@@ -45,11 +45,12 @@ class AzureDevOpsHandler():
 			print( f'##vso[task.setvariable variable=pr_thread_id]{commentId}' )
 		else:
 			print( f'Could not create thread on pull request {pullRequestId} ({response.responseBody} -- {response.statusCode})' )
+		return response
 
 
 	def edit_comment(self, sslVerify, token, pullRequestId, commentBody, buildId, workspace, **kwargs):
 		#self.update_thread(sslVerify, token, pullRequestId, commentBody, **kwargs)
-		self.update_comment(sslVerify, token, pullRequestId, commentBody, **kwargs)
+		return self.update_comment(sslVerify, token, pullRequestId, commentBody, **kwargs)
 
 
 	def update_thread(self, sslVerify, token, pullRequestId, commentBody, **kwargs):
@@ -76,6 +77,7 @@ class AzureDevOpsHandler():
 			print( f'Thread updated succesfully' )
 		else:
 			print( f'Could not create thread on pull request {pullRequestId} ({response.responseBody} -- {response.statusCode})' )
+		return response
 
 
 	def update_comment(self, sslVerify, token, pullRequestId, commentBody, **kwargs):
@@ -109,3 +111,4 @@ class AzureDevOpsHandler():
 			print( f'Thread updated succesfully' )
 		else:
 			print( f'Could not update comment on pull request {pullRequestId} ({response.responseBody} -- {response.statusCode})' )
+		return response
@@ -1,6 +1,7 @@
 ''' Bitbucket Server Interface '''
 import json
-from modules.utils import INFO_TAG, WARNING_TAG, ERROR_LINE, print_key_value_list
+import urllib.parse
+from modules.utils import INFO_TAG, WARNING_TAG, ERROR_LINE, SUCCESS_LINE, print_key_value_list
 from modules.git_server_callout import http_request
 from modules.comment_operations import get_last_comment, append_new_comments, save_comment_to_file
 
@@ -31,6 +32,7 @@ class BitbucketCloud():
 			print( f'{INFO_TAG} Branch \'{branchName}\' created' )
 		else:
 			print( f'{WARNING_TAG} Branch \'{branchName}\' not created. Status code: {response.statusCode}' )
+		return response
 
 	def create_tag(self, sslVerify, token, tagName, commitHash, **kwargs):
 		''' Method for creating new tag '''
@@ -52,6 +54,45 @@ class BitbucketCloud():
 			print( f'{INFO_TAG} Tag Created' )
 		else:
 			print( f'{WARNING_TAG} TAG \'{tagName}\' not created. Status code: {response.statusCode}' )
+		return response
+
+	def delete_branch(self, sslVerify, token, branchName, **kwargs):
+		''' Method for deleting a branch '''
+
+		url     = ( f'{self.host}/api/2.0/repositories/{self.owner}/{self.projectName}/refs/branches/{urllib.parse.quote( branchName )}' )
+		headers = { 'authorization' : f'Basic {token}' }
+
+		print_key_value_list( f'{INFO_TAG} Deleting branch:', [ 
+			( 'Remote URL', self.host ), ( 'Owner', self.owner ), ( 'Project Name', self.projectName ), 
+			( 'Branch Name', branchName ), ( 'Endpoint', f'{url}' ) 
+		] )
+
+		response = http_request( url, None, headers, 'DELETE', sslVerify )
+
+		if response.statusCode == 204:
+			print( f'{INFO_TAG} Branch \'{branchName}\' deleted' )
+		else:
+			print( f'{WARNING_TAG} Branch \'{branchName}\' not deleted. Status code: {response.statusCode}' )
+		return response
+
+	def delete_tag(self, sslVerify, token, tagName, **kwargs):
+		''' Method for deleting a tag '''
+
+		url     = ( f'{self.host}/api/2.0/repositories/{self.owner}/{self.projectName}/refs/tags/{urllib.parse.quote( tagName )}' )
+		headers = { 'authorization' : f'Basic {token}' }
+
+		print_key_value_list( f'{INFO_TAG} Deleting tag:', [ 
+			( 'Remote URL', self.host ), ( 'Owner', self.owner ), ( 'Project Name', self.projectName ), 
+			( 'Tag Name', tagName ), ( 'Endpoint', f'{url}' ) 
+		] )
+
+		response = http_request( url, None, headers, 'DELETE', sslVerify )
+
+		if response.statusCode == 204:
+			print( f'{INFO_TAG} Tag \'{tagName}\' deleted' )
+		else:
+			print( f'{WARNING_TAG} TAG \'{tagName}\' not deleted. Status code: {response.statusCode}' )
+		return response
 
 	def update_commit_status(self, sslVerify, token, commitHash, status, buildUrl, **kwargs):
 		''' Updates the commit status '''
@@ -73,6 +114,7 @@ class BitbucketCloud():
 			print( f'{SUCCESS_LINE} Commit status updated Successfully' )
 		else:
 			print( f'{ERROR_LINE} Could not update commit status' )
+		return response
 
 	def add_comment(self, sslVerify, token, pullRequestId, newComments, buildId, workspace, **kwargs):
 		''' Adds a new comment to the pull request '''
@@ -98,6 +140,7 @@ class BitbucketCloud():
 			print( f'{SUCCESS_LINE} Comment created succesfully with id \'{commentId}\', saved to ./{buildId}-comment.txt' )
 		else:
 			print( f'{ERROR_LINE} Could not create comment on pull request ({response.responseBody} -- {response.statusCode})' )
+		return response
 
 	def edit_comment(self, sslVerify, token, pullRequestId, newComments, buildId, workspace, **kwargs):
 		''' Appends message to the pull request's comments '''
@@ -123,4 +166,5 @@ class BitbucketCloud():
 			save_comment_to_file( commentBody, buildId, commentId, workspace )
 			print( f'{SUCCESS_LINE} Comment created succesfully with id \'{commentId}\', saved to ./{buildId}-comment.txt' )
 		else:
-			print( f'{ERROR_LINE} Could not edit comment on pull request ({response.responseBody} -- {response.statusCode})' )
\ No newline at end of file
+			print( f'{ERROR_LINE} Could not edit comment on pull request ({response.responseBody} -- {response.statusCode})' )
+		return response
\ No newline at end of file
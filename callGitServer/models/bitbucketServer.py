@@ -1,5 +1,6 @@
 ''' Bitbucket Server Interface '''
 import json
+import urllib.parse
 from modules.utils import INFO_TAG, WARNING_TAG, ERROR_LINE, SUCCESS_LINE, print_key_value_list
 from modules.git_server_callout import http_request
 from modules.comment_operations import get_last_comment, append_new_comments, save_comment_to_file
@@ -31,6 +32,7 @@ class BitbucketServer():
 			print( f'{INFO_TAG} Branch \'{branchName}\' created' )
 		else:
 			print( f'{WARNING_TAG} Branch \'{branchName}\' not created. Status code: {response.statusCode}' )
+		return response
 
 	def create_tag(self, sslVerify, token, tagName, commitHash, **kwargs):
 		''' Method for creating new tag '''
@@ -54,6 +56,48 @@ class BitbucketServer():
 			print( f'{INFO_TAG} Tag Created' )
 		else:
 			print( f'{WARNING_TAG} TAG \'{tagName}\' not created. Status code: {response.statusCode}' )
+		return response
+
+	def delete_branch(self, sslVerify, token, branchName, **kwargs):
+		''' Method for deleting a branch '''
+
+		url		= ( f'{self.host}/rest/branch-utils/1.0/projects/{self.project}/repos/{self.repository}/branches' )
+		headers	= { 'Authorization' : f'Bearer {token}', 'Content-Type' : 'application/json' }
+		payload	= { 'name' : f'refs/heads/{branchName}', 'dryRun' : False }
+		payload	= json.dumps( payload )
+		data	= payload.encode( 'utf-8' )
+
+		print_key_value_list( f'{INFO_TAG} Deleting branch:', [ 
+			( 'Remote URL', self.host ), ( 'Project', self.project ), ( 'Repository', self.repository ), 
+			( 'Branch Name', branchName ), ( 'Endpoint', f'{url}' ) 
+		] )
+
+		response = http_request( url, data, headers, 'DELETE', sslVerify )
+
+		if response.statusCode == 204:
+			print( f'{INFO_TAG} Branch \'{branchName}\' deleted' )
+		else:
+			print( f'{WARNING_TAG} Branch \'{branchName}\' not deleted. Status code: {response.statusCode}' )
+		return response
+
+	def delete_tag(self, sslVerify, token, tagName, **kwargs):
+		''' Method for deleting a tag '''
+
+		url		= ( f'{self.host}/rest/git/1.0/projects/{self.project}/repos/{self.repository}/tags/{urllib.parse.quote( tagName )}' )
+		headers	= { 'Authorization' : f'Bearer {token}' }
+
+		print_key_value_list( f'{INFO_TAG} Deleting tag:', [ 
+			( 'Remote URL', self.host ), ( 'Project', self.project ), ( 'Repository', self.repository ), 
+			( 'Tag Name', tagName ), ( 'Endpoint', f'{url}' ) 
+		] )
+
+		response = http_request( url, None, headers, 'DELETE', sslVerify )
+
+		if response.statusCode == 204:
+			print( f'{INFO_TAG} Tag \'{tagName}\' deleted' )
+		else:
+			print( f'{WARNING_TAG} TAG \'{tagName}\' not deleted. Status code: {response.statusCode}' )
+		return response
 
 	def update_commit_status(self, sslVerify, token, commitHash, status, buildUrl, **kwargs):
 		''' Updates the commit status '''
@@ -78,6 +122,7 @@ class BitbucketServer():
 			print( f'{SUCCESS_LINE} Commit status updated Successfully' )
 		else:
 			print( f'{ERROR_LINE} Could not update commit status' )
+		return response
 
 	def approve_pull_request(self, sslVerify, token, pullRequestId, userSlug, **kwargs):
 		url = (f'{self.host}/rest/api/1.0/projects/{self.project}/repos/{self.repository}/pull-requests/{pullRequestId}/participants/{userSlug}')
@@ -94,6 +139,7 @@ class BitbucketServer():
 			print( f'{SUCCESS_LINE} Pull request approved successfully id {pullRequestId}')
 		else:
 			print( f'{ERROR_LINE} Could not approve pull request ({response.responseBody} -- {response.statusCode})' )
+		return response
 			
 	def add_comment(self, sslVerify, token, pullRequestId, newComments, buildId, workspace, **kwargs):
 		''' Adds a new comment to the pull request '''
@@ -120,6 +166,7 @@ class BitbucketServer():
 			print( f'{SUCCESS_LINE} Comment created succesfully with id \'{commentId}\', saved to ./{buildId}-comment.txt' )
 		else:
 			print( f'{ERROR_LINE} Could not create comment on pull request ({response.responseBody} -- {response.statusCode})' )
+		return response
 
 	def edit_comment(self, sslVerify, token, pullRequestId, newComments, buildId, workspace, **kwargs):
 		''' Appends message to the pull request's comments '''
@@ -147,4 +194,5 @@ class BitbucketServer():
 			save_comment_to_file( commentBody, buildId, commentId, workspace, commentVersion )
 			print( f'{SUCCESS_LINE} Comment created succesfully with id \'{commentId}\', saved to ./{buildId}-comment.txt' )
 		else:
-			print( f'{ERROR_LINE} Could not edit comment on pull request ({response.responseBody} -- {response.statusCode})' )
\ No newline at end of file
+			print( f'{ERROR_LINE} Could not edit comment on pull request ({response.responseBody} -- {response.statusCode})' )
+		return response
\ No newline at end of file
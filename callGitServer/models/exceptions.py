@@ -24,4 +24,29 @@ class ApproveSameUserAsCreated(CallGitServerException):
     def __init__(self):
         message = f'The approval cannot be applied because the user approving the pull request matches the user who created the pull request. You cannot approve a pull request that you created.'
         super().__init__( self, message )
-        
\ No newline at end of file
+        
+
+class BatchOperationsFailed(CallGitServerException):
+    ''' Exception throwed when some operations of a batch did not succeed '''
+    STATUS_CODE = 130
+
+    def __init__(self, failed, total):
+        super().__init__( f'{failed} of {total} batch operations failed, see the report for details' )
+
+class ReleaseRolledBack(CallGitServerException):
+    ''' Exception throwed when only one of the release refs could be created, the other one is deleted '''
+    STATUS_CODE = 131
+
+    def __init__(self, createdRef, failedRef, deleted):
+        if deleted:
+            message = f'{failedRef} could not be created, {createdRef} has been deleted to not leave a partial release.'
+        else:
+            message = f'{failedRef} could not be created and {createdRef} could not be deleted, the release is partial.'
+        super().__init__( message )
+
+class CommitStatusFailed(CallGitServerException):
+    ''' Exception throwed when the status of some commits could not be updated '''
+    STATUS_CODE = 132
+
+    def __init__(self, failed, total):
+        super().__init__( f'Could not update the status of {len( failed )} of {total} commits: {", ".join( failed )}' )
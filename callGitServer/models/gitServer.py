@@ -38,33 +38,46 @@ class GitServer():
 		if 'gitTerminal' in kwargs and kwargs[ 'gitTerminal' ]:
 			self.create_branch_terminal( branchName, commitHash, **kwargs )
 		else:
-			self.gitHandler.create_branch( self.sslVerify, token, branchName, commitHash, **kwargs )
+			return self.gitHandler.create_branch( self.sslVerify, token, branchName, commitHash, **kwargs )
 
 
 	def create_tag(self, token, tagName, commitHash, **kwargs):
 		if 'gitTerminal' in kwargs and kwargs[ 'gitTerminal' ]:
 			self.create_tag_terminal( tagName, commitHash, **kwargs )
 		else:
-			self.gitHandler.create_tag( self.sslVerify, token, tagName, commitHash, **kwargs )
+			return self.gitHandler.create_tag( self.sslVerify, token, tagName, commitHash, **kwargs )
+
+
+	def supports_ref_deletion(self):
+		''' Azure DevOps and AWS handlers can not delete branches or tags, a partial release is not rolled back '''
+		return hasattr( self.gitHandler, 'delete_branch' ) and hasattr( self.gitHandler, 'delete_tag' )
+
+
+	def delete_branch(self, token, branchName, **kwargs):
+		return self.gitHandler.delete_branch( self.sslVerify, token, branchName, **kwargs )
+
+
+	def delete_tag(self, token, tagName, **kwargs):
+		return self.gitHandler.delete_tag( self.sslVerify, token, tagName, **kwargs )
 
 
 	def update_commit_status(self, token, commitHash, status, buildUrl, **kwargs ):
-		self.gitHandler.update_commit_status( self.sslVerify, token, commitHash, status, buildUrl, **kwargs )
+		return self.gitHandler.update_commit_status( self.sslVerify, token, commitHash, status, buildUrl, **kwargs )
 
 
 	def add_comment(self, token, mergeRequestId, newComments, buildId, workspace, **kwargs):
-		self.gitHandler.add_comment( self.sslVerify, token, mergeRequestId, newComments, buildId, workspace, **kwargs )
+		return self.gitHandler.add_comment( self.sslVerify, token, mergeRequestId, newComments, buildId, workspace, **kwargs )
 
 	def approve_pull_request(self, token, mergeRequestId, userSlug, **kwargs):
 		if self.isBitbucketServer == True or "amazon" in self.host:
-			self.gitHandler.approve_pull_request(self.sslVerify, token, mergeRequestId, userSlug, **kwargs)
+			return self.gitHandler.approve_pull_request(self.sslVerify, token, mergeRequestId, userSlug, **kwargs)
 		else:
 			raise Exception('Not Implemented') #METHOD NOT ALLOWED FOR GITLAB HOST
 	def edit_comment(self, token, mergeRequestId, newComments, buildId, workspace, **kwargs):
-		self.gitHandler.edit_comment( self.sslVerify, token, mergeRequestId, newComments, buildId, workspace, **kwargs )
+		return self.gitHandler.edit_comment( self.sslVerify, token, mergeRequestId, newComments, buildId, workspace, **kwargs )
 
 
-	def create_branch_terminal(self, branchName, commitHash):
+	def create_branch_terminal(self, branchName, commitHash, **kwargs):
 
 		print( f'{INFO_TAG} Flag -gt detected. branch will be created by Git Terminal' )
 
@@ -86,7 +99,7 @@ class GitServer():
 			raise Exception( code )
 
 
-	def create_tag_terminal(self, tagName, commitHash):
+	def create_tag_terminal(self, tagName, commitHash, **kwargs):
 
 		print( f'{INFO_TAG} Flag -gt detected. Tag will be created by Git Terminal' )
 
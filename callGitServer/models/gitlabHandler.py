@@ -1,5 +1,5 @@
 ''' Bitbucket Server Interface '''
-import urllib
+import urllib.parse
 from modules.utils import INFO_TAG, WARNING_TAG, ERROR_LINE, SUCCESS_LINE, print_key_value_list
 from modules.git_server_callout import http_request
 from modules.comment_operations import get_last_comment, append_new_comments, save_comment_to_file
@@ -29,6 +29,7 @@ class GitlabHandler():
 			print( f'{INFO_TAG} Branch \'{branchName}\' created' )
 		else:
 			print( f'{WARNING_TAG} Branch \'{branchName}\' not created. Status code: {response.statusCode}' )
+		return response
 
 	def create_tag(self, sslVerify, token, tagName, commitHash, **kwargs):
 		''' Method for creating new tag '''
@@ -52,6 +53,43 @@ class GitlabHandler():
 			print( f'{INFO_TAG} Tag Created' )
 		else:
 			print( f'{WARNING_TAG} TAG \'{tagName}\' not created. Status code: {response.statusCode}' )
+		return response
+
+	def delete_branch(self, sslVerify, token, branchName, **kwargs):
+		''' Method for deleting a branch '''
+
+		url		= ( f'{self.host}/api/v4/projects/{self.projectId}/repository/branches/{urllib.parse.quote( branchName, safe="" )}' )
+		headers	= { 'Private-Token' : token }
+
+		print_key_value_list( f'{INFO_TAG} Deleting branch:', [ 
+			( 'Remote URL', self.host ), ( 'Project Id', self.projectId ), ( 'Branch Name', branchName ), ( 'Endpoint', f'{url}' ) 
+		] )
+
+		response = http_request( url, None, headers, 'DELETE', sslVerify )
+
+		if response.statusCode == 204:
+			print( f'{INFO_TAG} Branch \'{branchName}\' deleted' )
+		else:
+			print( f'{WARNING_TAG} Branch \'{branchName}\' not deleted. Status code: {response.statusCode}' )
+		return response
+
+	def delete_tag(self, sslVerify, token, tagName, **kwargs):
+		''' Method for deleting a tag '''
+
+		url		= ( f'{self.host}/api/v4/projects/{self.projectId}/repository/tags/{urllib.parse.quote( tagName, safe="" )}' )
+		headers	= { 'Private-Token' : token }
+
+		print_key_value_list( f'{INFO_TAG} Deleting tag:', [ 
+			( 'Remote URL', self.host ), ( 'Project Id', self.projectId ), ( 'Tag Name', tagName ), ( 'Endpoint', f'{url}' ) 
+		] )
+
+		response = http_request( url, None, headers, 'DELETE', sslVerify )
+
+		if response.statusCode == 204:
+			print( f'{INFO_TAG} Tag \'{tagName}\' deleted' )
+		else:
+			print( f'{WARNING_TAG} TAG \'{tagName}\' not deleted. Status code: {response.statusCode}' )
+		return response
 
 	def update_commit_status(self, sslVerify, token, commitHash, status, buildUrl, **kwargs):
 		''' Updates the commit status '''
@@ -74,6 +112,7 @@ class GitlabHandler():
 			print( f'{SUCCESS_LINE} Commit status updated Successfully' )
 		else:
 			print( f'{ERROR_LINE} Could not update commit status' )
+		return response
 
 	def add_comment(self, sslVerify, token, mergeRequestId, newComments, buildId, workspace, **kwargs):
 		''' Adds a new comment to the merge request '''
@@ -98,6 +137,7 @@ class GitlabHandler():
 			print( f'{SUCCESS_LINE} Comment created succesfully with id \'{commentId}\', saved to ./{buildId}-comment.txt' )
 		else:
 			print( f'{ERROR_LINE} Could not create comment on merge request ({response.responseBody} -- {response.statusCode})' )
+		return response
 
 	def edit_comment(self, sslVerify, token, mergeRequestId, newComments, buildId, workspace, **kwargs):
 		''' Appends message to the merge request's comments '''
@@ -122,4 +162,5 @@ class GitlabHandler():
 			save_comment_to_file( commentBody, buildId, commentId, workspace )
 			print( f'{SUCCESS_LINE} Comment created succesfully with id \'{commentId}\', saved to ./{buildId}-comment.txt' )
 		else:
-			print( f'{ERROR_LINE} Could not edit comment on merge request ({response.responseBody} -- {response.statusCode})' )
\ No newline at end of file
+			print( f'{ERROR_LINE} Could not edit comment on merge request ({response.responseBody} -- {response.statusCode})' )
+		return response
\ No newline at end of file
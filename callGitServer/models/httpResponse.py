@@ -2,11 +2,16 @@
 
 class HttpResponse:
 
-    def __init__( self, statusCode, message, reason, responseBody ):
+    def __init__( self, statusCode, message, reason, responseBody, headers=None ):
         self.statusCode     = statusCode
         self.message        = message
         self.reason         = reason
         self.responseBody   = responseBody
+        self.headers        = headers
+
+    def is_success( self ):
+        ''' True for 2xx status codes '''
+        return self.statusCode is not None and 200 <= self.statusCode < 300
 
     def __repr__( self ):
         return ( f'<HttpResponse, {self.reason} ({self.statusCode})>' )
\ No newline at end of file
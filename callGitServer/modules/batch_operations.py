@@ -0,0 +1,172 @@
+''' Batch Operations Module '''
+import sys
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from models.exceptions import BatchOperationsFailed
+from modules.custom_argparser import parse_args
+from modules.utils import INFO_TAG, ERROR_TAG, WARNING_TAG
+
+BATCH_OPTIONS = [ 'comment', 'status', 'release', 'approve' ]
+
+
+class BatchOperation():
+
+    def __init__( self, line, option, args=None, error=None ):
+        self.line       = line
+        self.option     = option
+        self.args       = args
+        self.error      = error
+        self.responses  = []
+        self.unknown    = False
+        self.elapsed    = 0
+
+    def to_result( self ):
+        return {
+            'line'      : self.line,
+            'option'    : self.option,
+            'success'   : self.is_success(),
+            'responses' : [ { 'statusCode' : response.statusCode, 'reason' : response.reason } for response in self.responses ],
+            'error'     : self.error,
+            'elapsed'   : round( self.elapsed, 3 )
+        }
+
+    def is_success( self ):
+        ''' None when the handler gave no response for some request, so its result is unknown '''
+        if self.error or not all( response.is_success() for response in self.responses ):
+            return False
+        return None if self.unknown else True
+
+
+def run_batch(inputPath, workers, reportPath, handleOptions):
+    ''' Runs the operations of the JSON lines file ( - for stdin ) through handleOptions, operations
+        on the same merge request, commit, ref or comment file in file order and the rest concurrently
+        over the shared connections, then writes the report of every operation. Operations without
+        a response are reported as unknown, they are not counted as failed '''
+
+    if inputPath == '-':
+        listOperations = read_operations( sys.stdin )
+    else:
+        with open( inputPath, 'r', encoding='utf-8' ) as inputFile:
+            listOperations = read_operations( inputFile )
+
+    listValid = [ operation for operation in listOperations if not operation.error ]
+    print( f'{INFO_TAG} Running {len( listValid )} operations with {workers} workers' )
+
+    with ThreadPoolExecutor( max_workers=max( workers, 1 ) ) as executor:
+        listFutures = [ executor.submit( run_chain, chain, handleOptions ) for chain in get_chains( listValid ) ]
+        for future in listFutures:
+            future.result()
+
+    listResults = [ operation.to_result() for operation in listOperations ]
+    failed      = sum( 1 for result in listResults if result[ 'success' ] is False )
+    unknown     = sum( 1 for result in listResults if result[ 'success' ] is None )
+    with open( reportPath, 'w', encoding='utf-8' ) as reportFile:
+        json.dump( { 'operations' : len( listResults ), 'failed' : failed, 'unknown' : unknown, 'results' : listResults }, reportFile, indent=4 )
+
+    if unknown:
+        print( f'{WARNING_TAG} {unknown} operations gave no response, their result is unknown' )
+    if failed:
+        raise BatchOperationsFailed( failed, len( listResults ) )
+
+
+def read_operations(inputFile):
+    ''' Parses every line with the same parser and validations of the command line '''
+    listOperations = []
+    for line, content in enumerate( inputFile, 1 ):
+        if not content.strip():
+            continue
+        try:
+            operation   = json.loads( content )
+            option      = operation.pop( 'option' )
+        except ( ValueError, KeyError, AttributeError, TypeError ):
+            listOperations.append( BatchOperation( line, None, error='Line is not a JSON object with an option' ) )
+            continue
+
+        if not option in BATCH_OPTIONS:
+            listOperations.append( BatchOperation( line, option, error=f'Option not allowed in batch, use one of {BATCH_OPTIONS}' ) )
+            continue
+
+        try:
+            args = parse_args( [ option ] + get_operation_argv( operation ) )
+        except SystemExit:
+            print( f'{ERROR_TAG} Invalid arguments on line {line}' )
+            listOperations.append( BatchOperation( line, option, error='Invalid arguments' ) )
+            continue
+
+        # The connections are shared by every operation, the timeout is the one of the batch command
+        if args.timeout is not None:
+            print( f'{ERROR_TAG} Timeout on line {line}, use --timeout of the batch command' )
+            listOperations.append( BatchOperation( line, option, error='Timeout is only allowed on the batch command' ) )
+            continue
+        listOperations.append( BatchOperation( line, option, args=args ) )
+    return listOperations
+
+
+def get_operation_argv(operation):
+    ''' { 'merge-request-iid' : 3, 'no-ssl' : true, 'message' : [ 'a', 'b' ] } to
+        [ '--merge-request-iid', '3', '--no-ssl', '--message', 'a', 'b' ] '''
+    argv = []
+    for name, value in operation.items():
+        argument = name if name.startswith( '-' ) else f'--{name}'
+        if value is True:
+            argv.append( argument )
+        elif isinstance( value, list ):
+            argv.append( argument )
+            argv.extend( str( item ) for item in value )
+        elif value is not None and value is not False:
+            argv.extend( [ argument, str( value ) ] )
+    return argv
+
+
+def get_serial_keys(args):
+    ''' Operations sharing any of these keys must not run at the same time '''
+    if args.option == 'comment':
+        return [ ( 'mr', args.host, args.project, args.merge_request_iid ), ( 'file', args.workspace, args.build_id ) ]
+    if args.option == 'approve':
+        return [ ( 'mr', args.host, args.project, args.merge_request_iid ) ]
+    if args.option == 'status':
+        return [ ( 'commit', args.host, args.project, commitHash ) for commitHash in args.commit ]
+    if args.git_terminal:
+        # Git terminal releases share the working copy
+        return [ ( 'terminal', ) ]
+    return [ ( 'ref', args.host, args.project, args.tag_name ), ( 'ref', args.host, args.project, args.release_branch ) ]
+
+
+def get_chains(listOperations):
+    ''' Joins the operations that share a serial key, directly or through others, keeping the file order '''
+    listParents = list( range( len( listOperations ) ) )
+
+    def find(index):
+        while listParents[ index ] != index:
+            listParents[ index ]    = listParents[ listParents[ index ] ]
+            index                   = listParents[ index ]
+        return index
+
+    mapFirst = {}
+    for index, operation in enumerate( listOperations ):
+        for key in get_serial_keys( operation.args ):
+            if key in mapFirst:
+                listParents[ find( index ) ] = find( mapFirst[ key ] )
+            else:
+                mapFirst[ key ] = index
+
+    mapChains = {}
+    for index, operation in enumerate( listOperations ):
+        mapChains.setdefault( find( index ), [] ).append( operation )
+    return list( mapChains.values() )
+
+
+def run_chain(chain, handleOptions):
+    for operation in chain:
+        start = time.perf_counter()
+        try:
+            result              = handleOptions( operation.args )
+            listResponses       = result if isinstance( result, list ) else [ result ]
+            operation.responses = [ response for response in listResponses if response is not None ]
+            operation.unknown   = not listResponses or len( operation.responses ) < len( listResponses )
+        except Exception as exception:
+            print( f'{ERROR_TAG} Operation on line {operation.line} failed: {exception}' )
+            operation.error = str( exception ) or type( exception ).__name__
+        operation.elapsed = time.perf_counter() - start
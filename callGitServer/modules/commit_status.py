@@ -1,8 +1,43 @@
 ''' Update Commit Status Module '''
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from models.exceptions import CommitStatusFailed
 from models.gitServer import GitServer
+from modules.utils import SUCCESS_LINE, ERROR_TAG
 
 def update_commit_status( host, token, commitHash, status, buildUrl, sslVerify, **kwargs ):
     ''' Updates the commit status of the passed commit '''
 
     gitHandler = GitServer( host, sslVerify, **kwargs )
-    gitHandler.update_commit_status( token, commitHash, status, buildUrl, **kwargs )
\ No newline at end of file
+    return gitHandler.update_commit_status( token, commitHash, status, buildUrl, **kwargs )
+
+def update_commits_status( host, token, commitHashes, status, buildUrl, sslVerify, workers=4, **kwargs ):
+    ''' Updates the commit status of every passed commit through one GitServer, with at most
+        workers requests at a time. Returns the response of each commit, in the same order, once
+        every commit is done, or raises CommitStatusFailed with the commits that failed, also
+        when only one commit is passed '''
+
+    commitHashes = list( dict.fromkeys( commitHashes ) )
+    gitHandler   = GitServer( host, sslVerify, **kwargs )
+
+    def update( commitHash ):
+        return gitHandler.update_commit_status( token, commitHash, status, buildUrl, **kwargs )
+
+    mapResponses = {}
+    with ThreadPoolExecutor( max_workers=max( 1, min( workers, len( commitHashes ) ) ) ) as executor:
+        mapFutures = { executor.submit( update, commitHash ) : commitHash for commitHash in commitHashes }
+        for future in as_completed( mapFutures ):
+            commitHash = mapFutures[ future ]
+            try:
+                mapResponses[ commitHash ] = future.result()
+            except Exception as exception:
+                print( f'{ERROR_TAG} Status of {commitHash} not updated: {exception}' )
+                mapResponses[ commitHash ] = None
+
+    responses   = [ mapResponses[ commitHash ] for commitHash in commitHashes ]
+    failed      = [ commitHash for commitHash, response in zip( commitHashes, responses ) if response is None or not response.is_success() ]
+    if failed:
+        raise CommitStatusFailed( failed, len( commitHashes ) )
+    if len( commitHashes ) > 1:
+        print( f'{SUCCESS_LINE} Status of {len( commitHashes )} commits updated Successfully' )
+    return responses
@@ -1,9 +1,54 @@
 ''' Module for creating releases '''
+from concurrent.futures import ThreadPoolExecutor
+
 from models.gitServer import GitServer
+from models.exceptions import ReleaseRolledBack
+from modules.utils import WARNING_TAG
 
 def create_release(host, token, tagName, branchName, commitHash, sslVerify, **kwargs):
     ''' Creates a release (accepts merge + create tag + create branch) '''
     
     gitHandler = GitServer( host, sslVerify, **kwargs )
-    gitHandler.create_branch( token, branchName, commitHash, **kwargs )
-    gitHandler.create_tag( token, tagName, commitHash, **kwargs )
+    if 'gitTerminal' in kwargs and kwargs[ 'gitTerminal' ]:
+        gitHandler.create_branch( token, branchName, commitHash, **kwargs )
+        gitHandler.create_tag( token, tagName, commitHash, **kwargs )
+        return []
+
+    # Both refs are requested at the same time, if only one is created it is deleted again
+    with ThreadPoolExecutor( max_workers=2 ) as executor:
+        branchFuture    = executor.submit( gitHandler.create_branch, token, branchName, commitHash, **kwargs )
+        tagFuture       = executor.submit( gitHandler.create_tag, token, tagName, commitHash, **kwargs )
+        branchResponse, branchException = get_result( branchFuture )
+        tagResponse, tagException       = get_result( tagFuture )
+
+    branchCreated   = branchResponse is not None and branchResponse.is_success()
+    tagCreated      = tagResponse is not None and tagResponse.is_success()
+    if branchCreated and not tagCreated:
+        deleted = rollback( gitHandler, gitHandler.delete_branch, token, branchName, **kwargs )
+        raise ReleaseRolledBack( f'Branch \'{branchName}\'', f'Tag \'{tagName}\'', deleted ) from tagException
+    if tagCreated and not branchCreated:
+        deleted = rollback( gitHandler, gitHandler.delete_tag, token, tagName, **kwargs )
+        raise ReleaseRolledBack( f'Tag \'{tagName}\'', f'Branch \'{branchName}\'', deleted ) from branchException
+    if branchException or tagException:
+        raise branchException or tagException
+    return [ branchResponse, tagResponse ]
+
+def get_result(future):
+    ''' Returns the response of the future and the exception it raised '''
+    try:
+        return future.result(), None
+    except Exception as exception:
+        print( f'{WARNING_TAG} {exception}' )
+        return None, exception
+
+def rollback(gitHandler, deleteRef, token, refName, **kwargs):
+    ''' Deletes the ref created by the release, returns whether it was deleted '''
+    if not gitHandler.supports_ref_deletion():
+        print( f'{WARNING_TAG} Rollback is not supported for {type( gitHandler.gitHandler ).__name__}, \'{refName}\' has to be deleted manually' )
+        return False
+    try:
+        response = deleteRef( token, refName, **kwargs )
+        return response is not None and response.is_success()
+    except Exception as exception:
+        print( f'{WARNING_TAG} {exception}' )
+        return False
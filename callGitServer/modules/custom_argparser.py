@@ -6,8 +6,8 @@ import re
 from modules.utils import ( ENV_BUILD_ID, ENV_BUILD_URL, ENV_JOB_NAME, ENV_TARGET_BRANCH, ENV_WORKSPACE, WARNING_TAG )
 
 
-def parse_args():
-    ''' Arg parser method, initializes the possible subparsers '''
+def parse_args(argv=None):
+    ''' Arg parser method, initializes the possible subparsers, parses argv or the command line '''
     parser = argparse.ArgumentParser()
 
     # Global arguments
@@ -33,7 +33,11 @@ def parse_args():
     help_string = 'Approve Merge Request'
     approve_parser(subparsers.add_parser('approve', help= help_string))
 
-    args = parser.parse_args()
+    # Batch Subparser
+    help_string = 'Runs the operations of a JSON lines file, one option per line'
+    batch_parser(subparsers.add_parser('batch', help=help_string))
+
+    args = parser.parse_args( argv )
 
     # Post Validations
     if args.option == 'comment':
@@ -103,6 +107,7 @@ def comment_parser(parser):
     parser.add_argument( '-w', '--workspace', default=os.environ.get( ENV_WORKSPACE ), help='Workspace Path' )
     parser.add_argument( '-t', '--token', required=True, help='Git API Token (required)' )
     parser.add_argument( '-ns', '--no-ssl', action='store_false', dest='ssl_verify', help='Flag to verify the SSL in requests' )
+    parser.add_argument( '--timeout', type=float, default=None, help='Seconds to wait for the Git host on each request, default=no timeout' )
     parser.add_argument( '-fh', '--force-https', action='store_true', help='Flag to force https Git host' )
     parser.add_argument( '-p', '--project', required=True, help='Project Id (Gitlab), Project Name (Bitbucket/Azure DevOps) identifier or Repository Name (AWS) Identifier' )
     parser.add_argument( '-o', '--owner', help='Owner (Bitbucket) identifier or Organization (Azure DevOps)' )
@@ -122,6 +127,7 @@ def approve_parser(parser):
     parser.add_argument( '-w', '--workspace', default=os.environ.get( ENV_WORKSPACE ), help='Workspace Path' )
     parser.add_argument( '-t', '--token', required=True, help='Git API Token (required)' )
     parser.add_argument( '-ns', '--no-ssl', action='store_false', dest='ssl_verify', help='Flag to verify the SSL in requests' )
+    parser.add_argument( '--timeout', type=float, default=None, help='Seconds to wait for the Git host on each request, default=no timeout' )
     parser.add_argument( '-fh', '--force-https', action='store_true', help='Flag to force https Git host' )
     parser.add_argument( '-p', '--project', required=True, help='Project Id (Gitlab) or Project Name (Bitbucket) identifier' )
     parser.add_argument( '-o', '--owner', help='Owner (Bitbucket) identifier' )
@@ -133,10 +139,12 @@ def status_parser(parser):
     ''' Adds validate notification arguments to passed parser '''
     parser.add_argument( '-t', '--token', required=True, help='Git API Token' )
     parser.add_argument( '--status', '-s', required=True, help='New build status of the commit' )
-    parser.add_argument( '--commit', '-c', required=True, help='Commit to update' )
+    parser.add_argument( '--commit', '-c', required=True, nargs='+', help='Commits to update' )
+    parser.add_argument( '--workers', type=int, default=4, help='Commits updated at the same time, default=4' )
     parser.add_argument( '--build_url', '-b', default=os.environ.get( ENV_BUILD_URL ), help='Commit to update' )
     parser.add_argument( '--job-name', '-j', default=os.environ.get( ENV_JOB_NAME ), help='Job Name' )
     parser.add_argument( '-ns', '--no-ssl', action='store_false', dest='ssl_verify', help='Flag to verify the SSL in requests' )
+    parser.add_argument( '--timeout', type=float, default=None, help='Seconds to wait for the Git host on each request, default=no timeout' )
     parser.add_argument( '-fh', '--force-https', action='store_true', help='Flag to force https Git host' )
     parser.add_argument( '--description', '-d', default=None,  help='Description for Bitbucket builds' )
     parser.add_argument( '-bid', '--build-id', default=os.environ.get( ENV_BUILD_ID ), help='Current build id' )
@@ -156,6 +164,7 @@ def release_parser(parser):
     parser.add_argument( '-m', '--message', help='Tag Message' )
     parser.add_argument( '-rd', '--release_description', help='Tag Release Description' )
     parser.add_argument( '-ns', '--no-ssl', action='store_false', dest='ssl_verify', help='Flag to verify the SSL in requests' )
+    parser.add_argument( '--timeout', type=float, default=None, help='Seconds to wait for the Git host on each request, default=no timeout' )
     parser.add_argument( '-fh', '--force-https', action='store_true', help='Flag to force https Git host' )
     parser.add_argument( '-gt', '--git-terminal', action='store_true', help='Flag to run by Terminal Git' )
     parser.add_argument( '-p', '--project', required=True, help='Project Id (Gitlab) or Project Name (Bitbucket) identifier' )
@@ -164,5 +173,13 @@ def release_parser(parser):
     parser.add_argument( '-bs', '--bitbucketServer', type=checkBoolean, default=False, help='Flag to use Bitbucket Server' )
 
 
+def batch_parser(parser):
+    ''' Parser for batch option '''
+    parser.add_argument( '-f', '--file', default='-', help='JSON lines file, each line an object with the option and its long arguments, default=stdin' )
+    parser.add_argument( '-w', '--workers', type=int, default=4, help='Operations run at the same time, default=4' )
+    parser.add_argument( '-r', '--report', required=True, help='Path of the JSON report with the result of each operation' )
+    parser.add_argument( '--timeout', type=float, default=None, help='Seconds to wait for the Git host on each request of every operation, default=no timeout' )
+
+
 def checkBoolean(value):
     return ( value.lower() == 'true' )
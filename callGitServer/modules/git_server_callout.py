@@ -1,41 +1,267 @@
 ''' Git Server Callout Module '''
+import sys
 import json
+import ssl
+import time
+import select
+import threading
+import http.client
 import urllib
+import urllib.error
+import urllib.parse
 import urllib.request
-import ssl
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 
 from models.httpResponse import HttpResponse
+from modules.utils import WARNING_TAG
+
+MAX_IDLE_CONNECTIONS    = 4
+MAX_IDLE_SECONDS        = 5
+REDIRECT_STATUSES       = ( 301, 302, 303, 307, 308 )
+FORM_CONTENT_TYPE       = 'application/x-www-form-urlencoded'
+USER_AGENT              = f'Python-urllib/{sys.version_info[ 0 ]}.{sys.version_info[ 1 ]}'
+RATE_LIMITED_STATUS     = 429
+MAX_RATE_LIMIT_RETRIES  = 3
+MAX_RETRY_AFTER         = 60
+IDEMPOTENT_METHODS      = ( 'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE' )
+
+
+class ConnectionPool:
+    ''' Idle keep-alive connections by ( scheme, host, port, sslVerify ), so consecutive calls
+        to the same git server reuse the TCP and TLS session. Shared by every handler and safe
+        to use from several threads. Connections idle for more than maxIdleSeconds, or that the
+        server already closed, are dropped instead of reused '''
+
+    def __init__( self, maxIdle=MAX_IDLE_CONNECTIONS, maxIdleSeconds=MAX_IDLE_SECONDS ):
+        self.maxIdle        = maxIdle
+        self.maxIdleSeconds = maxIdleSeconds
+        self.timeout        = None
+        self.lock           = threading.Lock()
+        self.mapIdle        = {}
+        self.mapContexts    = {}
+
+    def get_ssl_context( self, sslVerify ):
+        ''' Returns the SSL context of the verify mode, created once per process '''
+        with self.lock:
+            if not sslVerify in self.mapContexts:
+                ctx = ssl.create_default_context()
+                if not sslVerify:
+                    # Context to avoid SSL verifications
+                    ctx.check_hostname  = False
+                    ctx.verify_mode     = ssl.CERT_NONE
+                self.mapContexts[ sslVerify ] = ctx
+            return self.mapContexts[ sslVerify ]
+
+    def get_timeout_args( self ):
+        ''' Without timeout the socket default is kept, as urlopen does '''
+        return { 'timeout' : self.timeout } if self.timeout else {}
+
+    def acquire( self, key, reuse=True ):
+        ''' Returns an idle connection of the key, or a new one, and whether it was reused '''
+        while reuse:
+            with self.lock:
+                listIdle = self.mapIdle.get( key )
+                if not listIdle:
+                    break
+                connection, releasedAt = listIdle.pop()
+            if time.monotonic() - releasedAt <= self.maxIdleSeconds and is_connection_alive( connection ):
+                return connection, True
+            connection.close()
+
+        scheme, host, port, sslVerify = key
+        if scheme == 'https':
+            connection = http.client.HTTPSConnection( host, port, context=self.get_ssl_context( sslVerify ), **self.get_timeout_args() )
+        else:
+            connection = http.client.HTTPConnection( host, port, **self.get_timeout_args() )
+        return connection, False
+
+    def release( self, key, connection ):
+        ''' Keeps the connection for the next call, closes it if there are enough idle ones '''
+        with self.lock:
+            listIdle = self.mapIdle.setdefault( key, [] )
+            if len( listIdle ) < self.maxIdle:
+                listIdle.append( ( connection, time.monotonic() ) )
+                return
+        connection.close()
+
+    def clear( self ):
+        ''' Closes every idle connection '''
+        with self.lock:
+            listConnections = [ connection for listIdle in self.mapIdle.values() for connection, _ in listIdle ]
+            self.mapIdle    = {}
+        for connection in listConnections:
+            connection.close()
+
+
+def is_connection_alive(connection):
+    ''' An idle connection has nothing to read, a readable socket is closed by the
+        server ( EOF ) or has unexpected data, either way it can not be reused '''
+    if connection.sock is None:
+        return False
+    try:
+        readable, _, _ = select.select( [ connection.sock ], [], [], 0 )
+    except ( OSError, ValueError ):
+        return False
+    return not readable
+
+
+class RateLimiter:
+    ''' Time until which each host asked not to be called, every request to a
+        rate limited host waits for it, not only the one that got the 429 '''
+
+    def __init__( self ):
+        self.lock       = threading.Lock()
+        self.mapBlocked = {}
+
+    def wait( self, host ):
+        with self.lock:
+            delay = self.mapBlocked.get( host, 0 ) - time.monotonic()
+        if delay > 0:
+            time.sleep( delay )
+
+    def block( self, host, seconds ):
+        with self.lock:
+            self.mapBlocked[ host ] = max( self.mapBlocked.get( host, 0 ), time.monotonic() + seconds )
+
+
+CONNECTION_POOL = ConnectionPool()
+RATE_LIMITER    = RateLimiter()
+
+
+def set_timeout(timeout):
+    ''' Seconds to wait for the git server on every request, None waits forever '''
+    CONNECTION_POOL.clear()
+    CONNECTION_POOL.timeout = timeout
+
 
 def http_request(url, data, headers, method, sslVerify):
-    ''' Utility method for doing http requests with urllib '''
+    ''' Utility method for doing http requests, rate limited ( 429 ) requests are sent
+        again after the Retry-After of the host '''
 
-    request = urllib.request.Request( url=url, data=data, headers=headers, method=method )
+    urlParts = urllib.parse.urlsplit( url )
+    for attempt in range( MAX_RATE_LIMIT_RETRIES + 1 ):
+        RATE_LIMITER.wait( urlParts.netloc )
+        response = send_request( url, urlParts, data, headers, method, sslVerify )
+        if response.statusCode != RATE_LIMITED_STATUS or attempt == MAX_RATE_LIMIT_RETRIES:
+            return response
+
+        delay = get_retry_after( response.headers, attempt )
+        print( f'{WARNING_TAG} Rate limited by {urlParts.netloc}, retrying in {delay:.1f}s' )
+        RATE_LIMITER.block( urlParts.netloc, delay )
+
+
+def send_request(url, urlParts, data, headers, method, sslVerify):
+    ''' Sends the request over a pooled keep-alive connection unless a proxy is configured
+        for the host or the server answers with a redirect, which are left to urllib '''
+
+    if uses_proxy( urlParts ):
+        return urllib_request( url, data, headers, method, sslVerify )
+
+    key     = ( urlParts.scheme, urlParts.hostname, urlParts.port, bool( sslVerify ) )
+    path    = urlParts.path or '/'
+    if urlParts.query:
+        path = f'{path}?{urlParts.query}'
 
     try:
-        if sslVerify:
-            with urllib.request.urlopen( request ) as response:
-                responseStatus = response.status
-                responseMsg    = response.msg
-                responseReason = response.reason
-                responseBody   = json.load( response )
-        else:
-            # Create context to avoid SSL verifications
-            ctx                 = ssl.create_default_context()
-            ctx.check_hostname  = False
-            ctx.verify_mode     = ssl.CERT_NONE
-            with urllib.request.urlopen( request, context=ctx ) as response:
-                responseStatus  = response.status
-                responseMsg     = response.msg
-                responseReason  = response.reason
-                try:
-                    responseBody = json.load( response )
-                except Exception as exception:
-                    responseBody = {}
+        response, responseBody = pooled_request( key, method, path, data, get_request_headers( data, headers ) )
+    except OSError as exception:
+        raise urllib.error.URLError( exception ) from exception
+
+    if response.status in REDIRECT_STATUSES:
+        return urllib_request( url, data, headers, method, sslVerify )
+    if not 200 <= response.status < 300:
+        # urllib raises an HTTPError for these, its body was never read
+        return HttpResponse( response.status, response.reason, response.reason, {}, response.headers )
+    return HttpResponse( response.status, response.reason, response.reason, parse_body( responseBody ), response.headers )
+
+
+def pooled_request(key, method, path, data, headers):
+    ''' Sends the request and reads the whole response, so the connection can go back to the pool.
+        A reused connection that the server already closed is retried once on a new one when the
+        request could not be sent, or for idempotent methods. A POST that was sent may have been
+        processed before the connection dropped, so it is not sent twice '''
+    connection, reused = CONNECTION_POOL.acquire( key )
+    while True:
+        sent = False
+        try:
+            connection.request( method, path, body=data, headers=headers )
+            sent            = True
+            response        = connection.getresponse()
+            responseBody    = response.read()
+            break
+        except ConnectionError:
+            connection.close()
+            if not reused or ( sent and not method.upper() in IDEMPOTENT_METHODS ):
+                raise
+            connection, reused = CONNECTION_POOL.acquire( key, reuse=False )
+        except Exception:
+            connection.close()
+            raise
+
+    if response.will_close:
+        connection.close()
+    else:
+        CONNECTION_POOL.release( key, connection )
+    return response, responseBody
+
+
+def get_request_headers(data, headers):
+    ''' Headers urllib would send, http.client adds Host, Accept-Encoding and Content-Length '''
+    requestHeaders = { 'User-Agent' : USER_AGENT }
+    requestHeaders.update( headers )
+    if data is not None and not any( header.lower() == 'content-type' for header in requestHeaders ):
+        requestHeaders[ 'Content-Type' ] = FORM_CONTENT_TYPE
+    return requestHeaders
+
+
+def uses_proxy(urlParts):
+    ''' True if a proxy environment variable applies to the url '''
+    mapProxies = urllib.request.getproxies()
+    return urlParts.scheme in mapProxies and not urllib.request.proxy_bypass( urlParts.netloc )
+
+
+def get_retry_after(responseHeaders, attempt):
+    ''' Seconds of the Retry-After header, in seconds or as a date, exponential backoff without it '''
+    retryAfter = responseHeaders.get( 'Retry-After' ) if responseHeaders else None
+    if retryAfter:
+        try:
+            return min( max( float( retryAfter ), 0 ), MAX_RETRY_AFTER )
+        except ValueError:
+            pass
+        try:
+            retryDate = parsedate_to_datetime( retryAfter )
+            return min( max( ( retryDate - datetime.now( timezone.utc ) ).total_seconds(), 0 ), MAX_RETRY_AFTER )
+        except ( TypeError, ValueError ):
+            pass
+    return min( 2 ** attempt, MAX_RETRY_AFTER )
+
+
+def parse_body(responseBody):
+    try:
+        return json.loads( responseBody )
+    except ValueError:
+        return {}
+
+
+def urllib_request(url, data, headers, method, sslVerify):
+    ''' Request through urllib, which handles proxies and follows redirects '''
+
+    request = urllib.request.Request( url=url, data=data, headers=headers, method=method )
+    try:
+        ctx = CONNECTION_POOL.get_ssl_context( bool( sslVerify ) )
+        with urllib.request.urlopen( request, context=ctx, **CONNECTION_POOL.get_timeout_args() ) as response:
+            responseStatus  = response.status
+            responseMsg     = response.msg
+            responseReason  = response.reason
+            responseBody    = parse_body( response.read() )
+            responseHeaders = response.headers
 
     except urllib.error.HTTPError as httpException:
         responseStatus  = httpException.getcode()
         responseMsg     = httpException.msg
         responseReason  = httpException.reason
         responseBody    = {}
+        responseHeaders = httpException.headers
 
-    return HttpResponse( responseStatus, responseMsg, responseReason, responseBody )
\ No newline at end of file
+    return HttpResponse( responseStatus, responseMsg, responseReason, responseBody, responseHeaders )
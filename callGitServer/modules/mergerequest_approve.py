@@ -4,4 +4,4 @@ from models.gitServer import GitServer
 def approve(host, token, mergeRequestId, userSlug, sslVerify, **kwargs):
     ''' Approve Pull Request  '''
     gitHandler = GitServer(host, sslVerify, **kwargs)
-    gitHandler.approve_pull_request(token, mergeRequestId, userSlug, **kwargs )
+    return gitHandler.approve_pull_request(token, mergeRequestId, userSlug, **kwargs )
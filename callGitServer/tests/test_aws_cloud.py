@@ -0,0 +1,18 @@
+import unittest
+from models.awsCloud import get_http_response
+
+
+class TestGetHttpResponse(unittest.TestCase):
+
+    def testStatus(self):
+        response = get_http_response( { 'ResponseMetadata' : { 'HTTPStatusCode' : 200, 'HTTPHeaders' : {} }, 'comment' : { 'commentId' : '1' } } )
+        self.assertTrue( response.is_success() )
+        self.assertEqual( response.reason, 'OK' )
+
+    def testFailedStatus(self):
+        response = get_http_response( { 'ResponseMetadata' : { 'HTTPStatusCode' : 400 } } )
+        self.assertFalse( response.is_success() )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from models.exceptions import BatchOperationsFailed
+from models.httpResponse import HttpResponse
+from modules.batch_operations import read_operations, run_batch
+from modules.custom_argparser import parse_args
+
+STATUS_OPERATION = { 'option' : 'status', 'host' : 'https://gitlab.com', 'token' : 't', 'project' : '1', 'commit' : 'c1',
+                     'status' : 'success', 'build_url' : 'u', 'job-name' : 'j', 'build-id' : 'b' }
+
+
+def readLines(*operations):
+    inputFile = io.StringIO( '\n'.join( json.dumps( operation ) for operation in operations ) )
+    with redirect_stdout( io.StringIO() ), redirect_stderr( io.StringIO() ):
+        return read_operations( inputFile )
+
+
+class TestReadOperations(unittest.TestCase):
+
+    def testValidOperation(self):
+        operation, = readLines( STATUS_OPERATION )
+        self.assertIsNone( operation.error )
+        self.assertEqual( operation.args.commit, [ 'c1' ] )
+
+    def testTimeoutOnLine(self):
+        operation, = readLines( dict( STATUS_OPERATION, timeout=5 ) )
+        self.assertIsNone( operation.args )
+        self.assertEqual( operation.error, 'Timeout is only allowed on the batch command' )
+
+    def testInvalidLines(self):
+        operations = readLines( { 'option' : 'version' }, { 'option' : 'status' }, [ 'status' ] )
+        self.assertEqual( [ operation.line for operation in operations ], [ 1, 2, 3 ] )
+        self.assertTrue( all( operation.error and operation.args is None for operation in operations ) )
+
+
+class TestRunBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup( shutil.rmtree, self.folder )
+
+    def runBatch(self, handleOptions, *operations):
+        inputPath   = os.path.join( self.folder, 'operations.jsonl' )
+        reportPath  = os.path.join( self.folder, 'report.json' )
+        with open( inputPath, 'w', encoding='utf-8' ) as inputFile:
+            inputFile.write( '\n'.join( json.dumps( operation ) for operation in operations ) )
+        with redirect_stdout( io.StringIO() ):
+            run_batch( inputPath, 2, reportPath, handleOptions )
+        with open( reportPath, 'r', encoding='utf-8' ) as reportFile:
+            return json.load( reportFile )
+
+    def testNoResponseIsUnknown(self):
+        report = self.runBatch( lambda args: None, STATUS_OPERATION )
+        self.assertEqual( ( report[ 'failed' ], report[ 'unknown' ] ), ( 0, 1 ) )
+        self.assertIsNone( report[ 'results' ][ 0 ][ 'success' ] )
+
+    def testResponses(self):
+        report = self.runBatch( lambda args: [ HttpResponse( 201, 'Created', 'Created', {} ) ], STATUS_OPERATION )
+        self.assertEqual( ( report[ 'failed' ], report[ 'unknown' ] ), ( 0, 0 ) )
+        self.assertTrue( report[ 'results' ][ 0 ][ 'success' ] )
+
+    def testFailedResponse(self):
+        with self.assertRaises( BatchOperationsFailed ):
+            self.runBatch( lambda args: HttpResponse( 500, 'Error', 'Error', {} ), STATUS_OPERATION )
+
+    def testReportRequired(self):
+        with redirect_stderr( io.StringIO() ), self.assertRaises( SystemExit ):
+            parse_args( [ 'batch', '-f', 'operations.jsonl' ] )
+
+
+if __name__ == '__main__':
+    unittest.main()
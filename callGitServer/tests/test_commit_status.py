@@ -0,0 +1,65 @@
+import io
+import threading
+import unittest
+from contextlib import redirect_stdout
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from models.exceptions import CommitStatusFailed
+from modules.commit_status import update_commits_status
+from modules.git_server_callout import CONNECTION_POOL
+
+
+class ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class StatusHandler(BaseHTTPRequestHandler):
+    ''' Gitlab statuses endpoint, the commit named bad gets a 500 '''
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read( int( self.headers.get( 'Content-Length', 0 ) ) )
+        commitHash = self.path.split( '/' )[ -1 ]
+        self.server.listCommits.append( commitHash )
+        self.send_response( 500 if commitHash == 'bad' else 200 )
+        self.send_header( 'Content-Length', '2' )
+        self.end_headers()
+        self.wfile.write( b'{}' )
+
+
+class TestUpdateCommitsStatus(unittest.TestCase):
+
+    def setUp(self):
+        self.server                 = ThreadingServer( ( '127.0.0.1', 0 ), StatusHandler )
+        self.server.listCommits     = []
+        threading.Thread( target=self.server.serve_forever, daemon=True ).start()
+        self.addCleanup( self.server.server_close )
+        self.addCleanup( self.server.shutdown )
+        self.addCleanup( CONNECTION_POOL.clear )
+
+    def updateStatus(self, commitHashes):
+        with redirect_stdout( io.StringIO() ):
+            return update_commits_status( f'http://127.0.0.1:{self.server.server_port}/gitlab', 't', commitHashes, 'success', 'url',
+                                          True, projectId='1', projectName='1', owner=None, jobName='job', isBitbucketServer=False )
+
+    def testOneCommit(self):
+        responses = self.updateStatus( [ 'c1' ] )
+        self.assertEqual( [ response.statusCode for response in responses ], [ 200 ] )
+
+    def testOneFailedCommit(self):
+        with self.assertRaises( CommitStatusFailed ) as context:
+            self.updateStatus( [ 'bad' ] )
+        self.assertIn( '1 of 1 commits: bad', str( context.exception ) )
+
+    def testFailedCommits(self):
+        with self.assertRaises( CommitStatusFailed ) as context:
+            self.updateStatus( [ 'c1', 'bad', 'c2', 'c1' ] )
+        self.assertIn( '1 of 3 commits: bad', str( context.exception ) )
+        self.assertEqual( sorted( self.server.listCommits ), [ 'bad', 'c1', 'c2' ] )
+
+
+if __name__ == '__main__':
+    unittest.main()
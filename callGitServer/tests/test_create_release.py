@@ -0,0 +1,34 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from models.awsCloud import awsCloud
+from models.gitlabHandler import GitlabHandler
+from models.gitServer import GitServer
+from models.httpResponse import HttpResponse
+from modules.create_release import rollback
+
+
+class TestRollback(unittest.TestCase):
+
+    def testDeletedRef(self):
+        gitHandler  = GitServer( 'https://gitlab.com', True, projectId='1', isBitbucketServer=False )
+        listDeleted = []
+        def deleteRef( token, refName, **kwargs ):
+            listDeleted.append( refName )
+            return HttpResponse( 204, 'No Content', 'No Content', {} )
+        self.assertIsInstance( gitHandler.gitHandler, GitlabHandler )
+        self.assertTrue( rollback( gitHandler, deleteRef, 't', 'release/1.0' ) )
+        self.assertEqual( listDeleted, [ 'release/1.0' ] )
+
+    def testNotSupported(self):
+        gitHandler = GitServer( 'https://git-codecommit.eu-west-1.amazonaws.com', True, projectId='repo', region='eu-west-1', isBitbucketServer=False )
+        self.assertIsInstance( gitHandler.gitHandler, awsCloud )
+        self.assertFalse( gitHandler.supports_ref_deletion() )
+        output = io.StringIO()
+        with redirect_stdout( output ):
+            self.assertFalse( rollback( gitHandler, gitHandler.delete_branch, 't', 'release/1.0' ) )
+        self.assertIn( 'Rollback is not supported for awsCloud', output.getvalue() )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import socket
+import threading
+import time
+import unittest
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from modules.git_server_callout import http_request, CONNECTION_POOL
+
+
+class ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    ''' Keep-alive handler that records each request and the connection it came from '''
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read( int( self.headers.get( 'Content-Length', 0 ) ) )
+        self.server.listRequests.append( ( id( self.connection ), self.path ) )
+        self.send_response( 201 )
+        self.send_header( 'Content-Length', '2' )
+        self.end_headers()
+        self.wfile.write( b'{}' )
+
+
+class IdleClosingHandler(KeepAliveHandler):
+    ''' Half-closes the connection when no request arrives in 0.1 seconds, a request
+        sent after that is never answered '''
+    timeout = 0.1
+
+    def handle(self):
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection:
+            self.handle_one_request()
+        try:
+            self.connection.shutdown( socket.SHUT_WR )
+        except OSError:
+            return
+        time.sleep( 0.5 )
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def startServer(self, handler):
+        server                  = ThreadingServer( ( '127.0.0.1', 0 ), handler )
+        server.listRequests     = []
+        threading.Thread( target=server.serve_forever, daemon=True ).start()
+        self.addCleanup( server.server_close )
+        self.addCleanup( server.shutdown )
+        self.addCleanup( CONNECTION_POOL.clear )
+        return server, f'http://127.0.0.1:{server.server_port}'
+
+    def testServerClosedIdleConnection(self):
+        server, url = self.startServer( IdleClosingHandler )
+        self.assertEqual( http_request( f'{url}/first', b'a=1', {}, 'POST', True ).statusCode, 201 )
+        time.sleep( 0.3 )
+        self.assertEqual( http_request( f'{url}/second', b'a=1', {}, 'POST', True ).statusCode, 201 )
+        self.assertEqual( [ path for _, path in server.listRequests ], [ '/first', '/second' ] )
+
+    def testReusedConnection(self):
+        server, url = self.startServer( KeepAliveHandler )
+        for _ in range( 3 ):
+            http_request( f'{url}/api', b'a=1', {}, 'POST', True )
+        self.assertEqual( len( { connectionId for connectionId, _ in server.listRequests } ), 1 )
+
+    def testExpiredIdleConnection(self):
+        server, url = self.startServer( KeepAliveHandler )
+        maxIdleSeconds = CONNECTION_POOL.maxIdleSeconds
+        CONNECTION_POOL.maxIdleSeconds = 0.1
+        self.addCleanup( setattr, CONNECTION_POOL, 'maxIdleSeconds', maxIdleSeconds )
+        http_request( f'{url}/first', b'a=1', {}, 'POST', True )
+        time.sleep( 0.3 )
+        http_request( f'{url}/second', b'a=1', {}, 'POST', True )
+        self.assertEqual( len( { connectionId for connectionId, _ in server.listRequests } ), 2 )
+
+
+if __name__ == '__main__':
+    unittest.main()
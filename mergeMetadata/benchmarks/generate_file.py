@@ -0,0 +1,193 @@
+''' Benchmark of generateFile against the previous string concatenation serializer,
+    over a synthetic corpus of large profiles and record types
+
+    Usage: python benchmarks/generate_file.py [-p PROFILES] [-e ELEMENTS] [-t RECORDTYPES] [-r REPEAT]
+'''
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert( 0, os.path.dirname( os.path.dirname( os.path.realpath( __file__ ) ) ) )
+
+from modules.merger.mergeFiles import generateFile
+from modules.parser.parseFiles import parseFile
+from modules.utils import XMLNS, XMLNS_DEF, IDENTATION
+
+
+def legacyXmlEncodeText( textValue ):
+    textValue = textValue.replace( "&", "&amp;" );
+    textValue = textValue.replace( "<", "&lt;" );
+    textValue = textValue.replace( ">", "&gt;" );
+    textValue = textValue.replace( "\"", "&quot;" );
+    textValue = textValue.replace( "'", "&apos;" );
+    return textValue
+
+
+def legacyGenerateFile(srcPath, folder, fileName, mapComponents, mapAttributes, fileTag):
+    xmlFile = '<?xml version="1.0" encoding="UTF-8"?>\n'
+    xmlFile += f'<{fileTag} xmlns="{XMLNS_DEF}">\n'
+    if 'recordTypes' == folder:
+        xmlFile += legacyAddRecordTypeValuesToFile( mapComponents, mapAttributes )
+    else:
+        xmlFile += legacyAddValuesToFile( mapComponents, mapAttributes )
+    xmlFile += f'</{fileTag}>\n'
+    with open( f'{srcPath}/{folder}/{fileName}', 'w', encoding='utf-8' ) as fileToWrite:
+        fileToWrite.write( xmlFile )
+
+
+def legacyAddValuesToFile(mapComponents, mapAttributes):
+    listComponents  = sorted( list( mapComponents.keys() ) + list( mapAttributes.keys() ) )
+    printValue      = ''
+    for componentType in listComponents:
+        if componentType in mapAttributes:
+            printValue += legacyGetValueFromAttributes( componentType, mapAttributes )
+        else:
+            printValue += legacyGetValueFromComponent( componentType, mapComponents )
+    return printValue
+
+
+def legacyAddRecordTypeValuesToFile(mapComponents, mapAttributes):
+    listComponents  = sorted( list( mapComponents.keys() ) + list( mapAttributes.keys() ) )
+    printValue      = ''
+    setComponents   = set( listComponents )
+    setComponents.remove( 'fullName' )
+    listComponents  = [ 'fullName' ] + sorted( setComponents )
+    for componentType in listComponents:
+        if componentType in mapAttributes:
+            printValue += legacyGetValueFromAttributes( componentType, mapAttributes )
+        else:
+            printValue += legacyGetValueFromComponent( componentType, mapComponents )
+    return printValue
+
+
+def legacyGetValueFromAttributes(componentType, mapAttributes):
+    componentValue = mapAttributes[ componentType ]
+    if componentValue:
+        return f'{IDENTATION}<{componentType}>{legacyXmlEncodeText(componentValue)}</{componentType}>\n'
+    return f'{IDENTATION}<{componentType}/>\n'
+
+
+def legacyGetValueFromComponent(componentType, mapComponents):
+    listComponents  = sorted( list( mapComponents[ componentType ].keys() ) )
+    printValue      = ''
+    for fullName in listComponents:
+        xmlElement      = mapComponents[ componentType ][ fullName ]
+        componentValue  = ''
+        if xmlElement.getchildren():
+            for childElement in xmlElement.getchildren():
+                tagName = childElement.tag.split( XMLNS )[ 1 ]
+                if childElement:
+                    childValue = legacyIterateChildsToPrint( childElement, 3 )
+                    componentValue += f'{IDENTATION*2}<{tagName}>\n{childValue}{IDENTATION*2}</{tagName}>\n'
+                else:
+                    componentValue += f'{IDENTATION*2}<{tagName}>{legacyXmlEncodeText(childElement.text)}</{tagName}>\n'
+            printValue += f'{IDENTATION}<{componentType}>\n{componentValue}{IDENTATION}</{componentType}>\n'
+        else:
+            printValue += f'{IDENTATION}<{fullName}/>\n'
+    return printValue
+
+
+def legacyIterateChildsToPrint(childElement, identationMultiplier):
+    printValue = ''
+    for subChildElement in childElement.getchildren():
+        tagName = subChildElement.tag.split( XMLNS )[ 1 ]
+        if subChildElement:
+            childValue = legacyIterateChildsToPrint( subChildElement, identationMultiplier+1 )
+            printValue += f'{IDENTATION*identationMultiplier}<{tagName}>\n{childValue}{IDENTATION*identationMultiplier}</{tagName}>\n'
+        else:
+            encodedValue = legacyXmlEncodeText(subChildElement.text) if subChildElement.text else ''
+            printValue += f'{IDENTATION*identationMultiplier}<{tagName}>{encodedValue}</{tagName}>\n'
+    return printValue
+
+
+def buildProfile(elements, randomizer):
+    parts = [ f'<?xml version="1.0" encoding="UTF-8"?>\n<Profile xmlns="{XMLNS_DEF}">\n' ]
+    for index in range( elements * 3 // 5 ):
+        parts.append( f'<fieldPermissions><editable>{randomizer.choice( [ "true", "false" ] )}</editable>'
+                      f'<field>Object{index % 300}__c.Field{index}__c</field><readable>true</readable></fieldPermissions>\n' )
+    for index in range( elements // 5 ):
+        parts.append( f'<classAccesses><apexClass>Class{index}</apexClass><enabled>true</enabled></classAccesses>\n' )
+    for index in range( elements // 5 ):
+        parts.append( f'<layoutAssignments><layout>Object{index}__c-Object {index} &amp; Layout</layout>'
+                      f'<recordType>Object{index}__c.Type_{index}</recordType></layoutAssignments>\n' )
+    parts.append( '<custom>false</custom><description>Synthetic &lt;profile&gt; &amp; "benchmark"</description><userLicense>Salesforce</userLicense></Profile>\n' )
+    return ''.join( parts )
+
+
+def buildRecordType(index, randomizer):
+    parts = [ f'<?xml version="1.0" encoding="UTF-8"?>\n<RecordType xmlns="{XMLNS_DEF}">\n'
+              f'<fullName>Type_{index}</fullName><active>true</active><label>Type {index}</label>\n' ]
+    for picklist in range( 20 ):
+        parts.append( f'<picklistValues><picklist>Picklist{picklist}__c</picklist>' )
+        for value in range( randomizer.randint( 5, 30 ) ):
+            parts.append( f'<values><fullName>Value {value} &amp; more</fullName><default>false</default></values>' )
+        parts.append( '</picklistValues>\n' )
+    parts.append( '</RecordType>\n' )
+    return ''.join( parts )
+
+
+def writeCorpus(corpusFolder, profiles, elements, recordTypes):
+    ''' Writes the corpus and returns the parsed ( folder, fileName, mapComponents, mapAttributes, fileTag ) inputs '''
+    randomizer  = random.Random( 0 )
+    inputs      = []
+    files       = [ ( 'profiles', f'Profile{index}.profile', 'Profile', buildProfile( elements, randomizer ) ) for index in range( profiles ) ]
+    files      += [ ( 'recordTypes', f'Type_{index}.recordType', 'RecordType', buildRecordType( index, randomizer ) ) for index in range( recordTypes ) ]
+    for folder, fileName, fileTag, content in files:
+        os.makedirs( f'{corpusFolder}/{folder}', exist_ok=True )
+        with open( f'{corpusFolder}/{folder}/{fileName}', 'w', encoding='utf-8' ) as corpusFile:
+            corpusFile.write( content )
+        mapComponents, mapAttributes = parseFile( f'{corpusFolder}/{folder}/{fileName}' )
+        inputs.append( ( folder, fileName, mapComponents, mapAttributes, fileTag ) )
+    return inputs
+
+
+def timeSerializer(serializer, inputs, outputFolder, repeat):
+    timings = []
+    for _ in range( repeat ):
+        start = time.perf_counter()
+        for folder, fileName, mapComponents, mapAttributes, fileTag in inputs:
+            serializer( outputFolder, folder, fileName, mapComponents, mapAttributes, fileTag )
+        timings.append( time.perf_counter() - start )
+    return min( timings )
+
+
+def readOutputs(outputFolder, inputs):
+    outputs = []
+    for folder, fileName, _, _, _ in inputs:
+        with open( f'{outputFolder}/{folder}/{fileName}', 'rb' ) as outputFile:
+            outputs.append( outputFile.read() )
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser( description='Benchmarks the merged file serializer' )
+    parser.add_argument( '-p', '--profiles', default=20, type=int, help='Number of profiles, default=20' )
+    parser.add_argument( '-e', '--elements', default=10000, type=int, help='Number of elements per profile, default=10000' )
+    parser.add_argument( '-t', '--recordTypes', default=200, type=int, help='Number of record types, default=200' )
+    parser.add_argument( '-r', '--repeat', default=3, type=int, help='Number of runs, the best one is reported, default=3' )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workFolder:
+        inputs = writeCorpus( f'{workFolder}/corpus', args.profiles, args.elements, args.recordTypes )
+        for outputFolder in [ f'{workFolder}/legacy', f'{workFolder}/current' ]:
+            for folder in [ 'profiles', 'recordTypes' ]:
+                os.makedirs( f'{outputFolder}/{folder}' )
+
+        legacyTime  = timeSerializer( legacyGenerateFile, inputs, f'{workFolder}/legacy', args.repeat )
+        currentTime = timeSerializer( generateFile, inputs, f'{workFolder}/current', args.repeat )
+        legacyOutputs   = readOutputs( f'{workFolder}/legacy', inputs )
+        identical       = legacyOutputs == readOutputs( f'{workFolder}/current', inputs )
+
+    print( f'Files      : {len( inputs )} ({sum( map( len, legacyOutputs ) ) / 1024 / 1024:.1f} MB)' )
+    print( f'Legacy     : {legacyTime:.3f}s' )
+    print( f'Current    : {currentTime:.3f}s' )
+    print( f'Speedup    : {legacyTime / currentTime:.2f}x' )
+    print( f'Identical  : {identical}' )
+    sys.exit( 0 if identical else 1 )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,11 @@
 import os
 import re
-import json
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 from modules.merger.mergeFiles import mergeFile
 from modules.utils import argparser, SET_PARSEABLE_FOLDERS
+from modules.utils.describe_index import readDescribeIndex
+from modules.utils.scanner import groupTree, scanTree
 from modules.utils.utilities import checkFolder
 from modules.utils.exceptions import NotCreatedDescribeLog
 
@@ -12,15 +14,40 @@ def main():
     args = argparser.parseArgs()
 
     setParseableObjects = readDescribe( args.describePath, SET_PARSEABLE_FOLDERS )
+    mapFolders          = scanTree( args.srcRetrievedPath, args.scanThreads )
+    listTasks           = getTasks( args.srcPath, args.srcRetrievedPath, setParseableObjects, mapFolders )
+
+    if args.jobs > 1:
+        # Every task writes its own files, the result does not depend on the order they finish
+        chunkSize = max( 1, len( listTasks ) // ( args.jobs * 8 ) )
+        with ProcessPoolExecutor( max_workers=args.jobs ) as executor:
+            for _ in executor.map( handleTask, listTasks, chunksize=chunkSize ):
+                pass
+    else:
+        for task in listTasks:
+            handleTask( task )
 
-    for folder in os.listdir( args.srcRetrievedPath ):
-        pathFolder = f'{args.srcRetrievedPath}/{folder}'
-        if os.path.isdir( pathFolder ):
-            for fileName in os.listdir( pathFolder ):
-                if folder in setParseableObjects:
-                    mergeFile( args.srcPath, args.srcRetrievedPath, folder, fileName )
-                else:
-                    copyFiles( args.srcPath, args.srcRetrievedPath, folder, fileName )
+
+def getTasks(srcPath, srcRetrievedPath, setParseableObjects, mapFolders):
+    ''' One task per retrieved file or folder, a folder ( objects/Account ) is handled
+        by a single task since its files are copied or merged into the same place.
+        Each task carries the scanned folders below its own entry '''
+    listTasks   = []
+    mapGroups   = groupTree( mapFolders )
+    for folder, isDir in mapFolders[ '' ]:
+        if isDir:
+            for fileName, _ in mapFolders[ folder ]:
+                mapTaskFolders = mapGroups.get( f'{folder}/{fileName}', {} )
+                listTasks.append( ( srcPath, srcRetrievedPath, folder, fileName, folder in setParseableObjects, mapTaskFolders ) )
+    return listTasks
+
+
+def handleTask(task):
+    srcPath, srcRetrievedPath, folder, fileName, isParseable, mapFolders = task
+    if isParseable:
+        mergeFile( srcPath, srcRetrievedPath, folder, fileName )
+    else:
+        copyFiles( srcPath, srcRetrievedPath, folder, fileName, mapFolders )
 
 
 def readDescribe(pathDescribe, setParseableObjects):
@@ -28,31 +55,28 @@ def readDescribe(pathDescribe, setParseableObjects):
     if not os.path.isfile( pathDescribe ):
         raise NotCreatedDescribeLog( pathDescribe )
     
-    with open( pathDescribe, 'r' ) as file:
-        data = json.load( file )
-
-    for metadataInfo in data[ 'metadataObjects' ]:
-        dirName         = metadataInfo[ 'directoryName' ]
-        childObjects    = metadataInfo[ 'childXmlNames' ] if 'childXmlNames' in metadataInfo else []
+    for ( _, dirName, _, _, _, childObjects ) in readDescribeIndex( pathDescribe ):
         if dirName != 'objects' and len( childObjects ) > 0:
             setParseableObjects.add( dirName )
 
     return setParseableObjects
 
 
-def copyFiles(srcPath, srcRetrievedPath, folder, fileName):
+def copyFiles(srcPath, srcRetrievedPath, folder, fileName, mapFolders):
+    ''' Copies the retrieved file or folder, mapFolders holds the scanned folders below it '''
     pathSrcRetrieved    = f'{srcRetrievedPath}/{folder}/{fileName}'
     pathSrcFolder       = f'{srcPath}/{folder}'
+    listEntries         = mapFolders.get( f'{folder}/{fileName}' )
 
-    if os.path.isdir( pathSrcRetrieved ):
+    if listEntries is not None:
         pathSrcSubFolder = f'{pathSrcFolder}/{fileName}'
         checkFolder( pathSrcFolder )
         checkFolder( pathSrcSubFolder )
         if fileName != 'recordTypes':
-            for file in os.listdir( pathSrcRetrieved ):
-                copyFiles( srcPath, srcRetrievedPath, f'{folder}/{fileName}', file )
+            for file, _ in listEntries:
+                copyFiles( srcPath, srcRetrievedPath, f'{folder}/{fileName}', file, mapFolders )
         else:
-            for file in os.listdir( pathSrcRetrieved ):
+            for file, _ in listEntries:
                 mergeFile( f'{srcPath}/{folder}', f'{srcRetrievedPath}/{folder}', fileName, file )
     else:
         checkFolder( pathSrcFolder )
@@ -1,14 +1,21 @@
 import os
 import shutil
+import tempfile
+import xml.etree.ElementTree as elTree
 from modules.utils import XMLNS, XMLNS_DEF, IDENTATION
 from modules.utils.utilities import checkFolder, xmlEncodeText
 from modules.parser.parseFiles import parseFile, mergeFileToCommit
 
+CHUNK_SIZE		= 1024 * 1024
+
+# Local names of the namespaced tags, a handful of distinct tags repeat across every file
+MAP_TAG_NAMES	= {}
+
+
 def mergeFile(srcPath, srcRetrievedPath, folder, fileName):
-	pathScrFolder	= f'{srcPath}/{folder}'
-	pathScrFile		= f'{srcPath}/{folder}/{fileName}'
+	pathScrFile = f'{srcPath}/{folder}/{fileName}'
 
-	if os.path.isdir( pathScrFolder ) and os.path.isfile( pathScrFile ):
+	if os.path.isfile( pathScrFile ):
 		handleModifiedFile( srcPath, srcRetrievedPath, folder, fileName )
 	else:
 		handleNewFile( srcPath, srcRetrievedPath, folder, fileName )
@@ -24,6 +31,9 @@ def handleNewFile(srcPath, srcRetrievedPath, folder, fileName):
 
 
 def handleModifiedFile(srcPath, srcRetrievedPath, folder, fileName):
+	if isSameContent( f'{srcPath}/{folder}/{fileName}', f'{srcRetrievedPath}/{folder}/{fileName}' ):
+		print( f'unchanged file : {fileName}' )
+		return
 	print( f'modified file : {fileName}' )
 	mapComponents, mapAttributes = parseFile( f'{srcRetrievedPath}/{folder}/{fileName}' )
 	fileTag = mergeFileToCommit( f'{srcPath}/{folder}/{fileName}', mapComponents, mapAttributes )
@@ -31,86 +41,111 @@ def handleModifiedFile(srcPath, srcRetrievedPath, folder, fileName):
 
 
 def generateFile(srcPath, folder, fileName, mapComponents, mapAttributes, fileTag):
-	xmlFile = '<?xml version="1.0" encoding="UTF-8"?>\n'
-	xmlFile += f'<{fileTag} xmlns="{XMLNS_DEF}">\n'
-	if 'recordTypes' == folder:
-		xmlFile += addRecordTypeValuesToFile( mapComponents, mapAttributes )
-	else:
-		xmlFile += addValuesToFile( mapComponents, mapAttributes )
-	xmlFile += f'</{fileTag}>\n'
-	with open( f'{srcPath}/{folder}/{fileName}', 'w', encoding='utf-8' ) as fileToWrite:
-		fileToWrite.write( xmlFile )
-
-
-def addValuesToFile(mapComponents, mapAttributes):
-	listComponents	= sorted( list( mapComponents.keys() ) + list( mapAttributes.keys() ) )
-	printValue		= ''
-	
-	for componentType in listComponents:
-		if componentType in mapAttributes:
-			printValue += getValueFromAttributes( componentType, mapAttributes )
+	''' Streams the merged file into a temporary file next to the local one, which
+		only replaces it when the content changed so unchanged files keep their mtime '''
+	filePath					= f'{srcPath}/{folder}/{fileName}'
+	fileDescriptor, tempPath	= tempfile.mkstemp( dir=f'{srcPath}/{folder}', suffix='.tmp' )
+	try:
+		with open( fileDescriptor, 'w', encoding='utf-8' ) as fileToWrite:
+			write = fileToWrite.write
+			write( '<?xml version="1.0" encoding="UTF-8"?>\n' )
+			write( f'<{fileTag} xmlns="{XMLNS_DEF}">\n' )
+			if 'recordTypes' == folder:
+				writeValues( write, getRecordTypeComponents( mapComponents, mapAttributes ), mapComponents, mapAttributes )
+			else:
+				writeValues( write, sorted( list( mapComponents.keys() ) + list( mapAttributes.keys() ) ), mapComponents, mapAttributes )
+			write( f'</{fileTag}>\n' )
+
+		if os.path.isfile( filePath ) and isSameFile( tempPath, filePath ):
+			os.remove( tempPath )
 		else:
-			printValue += getValueFromComponent( componentType, mapComponents )
-	return printValue
-
-
-def addRecordTypeValuesToFile(mapComponents, mapAttributes):
-	listComponents	= sorted( list( mapComponents.keys() ) + list( mapAttributes.keys() ) )
-	printValue		= ''
-	
-	setComponents	= set( listComponents )
+			if os.path.isfile( filePath ):
+				shutil.copymode( filePath, tempPath )
+			os.replace( tempPath, filePath )
+	except BaseException:
+		if os.path.exists( tempPath ):
+			os.remove( tempPath )
+		raise
+
+
+def isSameContent(pathSrcFile, pathSrcRetrievedFile):
+	''' True when the retrieved file is byte identical to the local one or equal once
+		canonicalized without the indentation, so merging would change nothing '''
+	if isSameFile( pathSrcFile, pathSrcRetrievedFile ):
+		return True
+	if not hasattr( elTree, 'canonicalize' ):
+		return False
+	return getCanonicalForm( pathSrcFile ) == getCanonicalForm( pathSrcRetrievedFile )
+
+
+def isSameFile(filePath, otherFilePath):
+	''' Byte comparison, files of different size are not read '''
+	if os.path.getsize( filePath ) != os.path.getsize( otherFilePath ):
+		return False
+	with open( filePath, 'rb' ) as fileToRead, open( otherFilePath, 'rb' ) as otherFileToRead:
+		while True:
+			chunk = fileToRead.read( CHUNK_SIZE )
+			if chunk != otherFileToRead.read( CHUNK_SIZE ):
+				return False
+			if not chunk:
+				return True
+
+
+def getCanonicalForm(filePath):
+	''' Drops the whitespace around the child elements, the text of the values is kept as it is '''
+	rootElement = elTree.parse( filePath ).getroot()
+	for xmlElement in rootElement.iter():
+		if len( xmlElement ) and xmlElement.text and not xmlElement.text.strip():
+			xmlElement.text = None
+		if xmlElement.tail and not xmlElement.tail.strip():
+			xmlElement.tail = None
+	return elTree.canonicalize( elTree.tostring( rootElement, encoding='unicode' ) )
+
+
+def getRecordTypeComponents(mapComponents, mapAttributes):
+	''' Record types keep fullName first and the rest sorted '''
+	setComponents = set( mapComponents.keys() ) | set( mapAttributes.keys() )
 	setComponents.remove( 'fullName' )
-	listComponents	= [ 'fullName' ] + sorted( setComponents )
+	return [ 'fullName' ] + sorted( setComponents )
+
 
+def writeValues(write, listComponents, mapComponents, mapAttributes):
 	for componentType in listComponents:
 		if componentType in mapAttributes:
-			printValue += getValueFromAttributes( componentType, mapAttributes )
+			writeAttribute( write, componentType, mapAttributes[ componentType ] )
 		else:
-			printValue += getValueFromComponent( componentType, mapComponents )
-	return printValue
+			writeComponent( write, componentType, mapComponents[ componentType ] )
 
 
-def getValueFromAttributes(componentType, mapAttributes):
-	attributeValue = ''
-	componentValue = mapAttributes[ componentType ]
-
+def writeAttribute(write, componentType, componentValue):
 	if componentValue:
-		attributeValue = f'{IDENTATION}<{componentType}>{xmlEncodeText(componentValue)}</{componentType}>\n'
+		write( f'{IDENTATION}<{componentType}>{xmlEncodeText( componentValue )}</{componentType}>\n' )
 	else:
-		attributeValue = f'{IDENTATION}<{componentType}/>\n'
-
-	return attributeValue
-
-
-def getValueFromComponent(componentType, mapComponents):
-	listComponents	= sorted( list( mapComponents[ componentType ].keys() ) )
-	printValue		= ''
-
-	for fullName in listComponents:
-		xmlElement		= mapComponents[ componentType ][ fullName ]
-		componentValue	= ''
-		if xmlElement.getchildren():
-			for childElement in xmlElement.getchildren():
-				tagName = childElement.tag.split( XMLNS )[ 1 ]
-				if childElement:
-					childValue = iterateChildsToPrint( childElement, 3 )
-					componentValue += f'{IDENTATION*2}<{tagName}>\n{childValue}{IDENTATION*2}</{tagName}>\n'
-				else:
-					componentValue += f'{IDENTATION*2}<{tagName}>{xmlEncodeText(childElement.text)}</{tagName}>\n'
-			printValue += f'{IDENTATION}<{componentType}>\n{componentValue}{IDENTATION}</{componentType}>\n'
-		else:
-			printValue += f'{IDENTATION}<{fullName}/>\n'
-	return printValue
+		write( f'{IDENTATION}<{componentType}/>\n' )
 
 
-def iterateChildsToPrint(childElement, identationMultiplier):
-	printValue = ''
-	for subChildElement in childElement.getchildren():
-		tagName = subChildElement.tag.split( XMLNS )[ 1 ]
-		if subChildElement:
-			childValue = iterateChildsToPrint( subChildElement, identationMultiplier+1 )
-			printValue += f'{IDENTATION*identationMultiplier}<{tagName}>\n{childValue}{IDENTATION*identationMultiplier}</{tagName}>\n'
+def writeComponent(write, componentType, mapElements):
+	for fullName in sorted( mapElements.keys() ):
+		xmlElement = mapElements[ fullName ]
+		if len( xmlElement ):
+			write( f'{IDENTATION}<{componentType}>\n' )
+			writeChilds( write, xmlElement, 2 )
+			write( f'{IDENTATION}</{componentType}>\n' )
+		else:
+			write( f'{IDENTATION}<{fullName}/>\n' )
+
+
+def writeChilds(write, xmlElement, identationMultiplier):
+	''' Writes the children of the element, walking every element once '''
+	identation = IDENTATION * identationMultiplier
+	for childElement in xmlElement:
+		tagName = MAP_TAG_NAMES.get( childElement.tag )
+		if tagName is None:
+			tagName = MAP_TAG_NAMES[ childElement.tag ] = childElement.tag.split( XMLNS )[ 1 ]
+		if len( childElement ):
+			write( f'{identation}<{tagName}>\n' )
+			writeChilds( write, childElement, identationMultiplier + 1 )
+			write( f'{identation}</{tagName}>\n' )
 		else:
-			encodedValue = xmlEncodeText(subChildElement.text) if subChildElement.text else ''
-			printValue += f'{IDENTATION*identationMultiplier}<{tagName}>{encodedValue}</{tagName}>\n'
-	return printValue
\ No newline at end of file
+			encodedValue = xmlEncodeText( childElement.text ) if childElement.text else ''
+			write( f'{identation}<{tagName}>{encodedValue}</{tagName}>\n' )
@@ -8,6 +8,8 @@ def parseArgs():
 	parser.add_argument( '-s', '--srcPath', help='Path where src is located' )
 	parser.add_argument( '-r', '--srcRetrievedPath', help='Path where retrieved package is located' )
 	parser.add_argument( '-d', '--describePath', help='Path where describe.log is located' )
+	parser.add_argument( '-j', '--jobs', default=1, type=int, help='Number of processes merging files in parallel, default=1' )
+	parser.add_argument( '-st', '--scanThreads', default=1, type=int, help='Number of threads scanning the retrieved folders, default=1' )
 	args = parser.parse_args()
 	
 	checkArgs( args )
@@ -1,7 +1,12 @@
 import os
+import re
 from modules.utils import XMLNS
 from modules.utils.exceptions import NoFullNameError
 
+XML_SPECIAL_CHARS   = re.compile( '[&<>"\']' )
+XML_ESCAPE_TABLE    = str.maketrans( { '&' : '&amp;', '<' : '&lt;', '>' : '&gt;', '"' : '&quot;', '\'' : '&apos;' } )
+SET_CHECKED_FOLDERS = set()
+
 MAP_COMPOSED_FULLNAME = {
     'actionOverrides'   : { 'main' : 'actionName', 'secondary' : 'formFactor' },
     'layoutAssignments' : { 'main' : 'layout', 'secondary' : 'recordType' }
@@ -30,8 +35,11 @@ MAP_FULLNAME = {
 }
 
 def checkFolder( folderPath ):
-    if not os.path.isdir( folderPath ):
-        os.makedirs( folderPath )
+    # Folders are created once per process, parallel tasks may still create the same folder at once
+    if folderPath in SET_CHECKED_FOLDERS:
+        return
+    os.makedirs( folderPath, exist_ok=True )
+    SET_CHECKED_FOLDERS.add( folderPath )
 
 def getFullName( tagName, childElement ):
     if tagName in MAP_COMPOSED_FULLNAME:
@@ -72,9 +80,7 @@ def getComposedName( tagName, childElement ):
     return fullName
 
 def xmlEncodeText( textValue ):
-    textValue = textValue.replace( "&", "&amp;" );
-    textValue = textValue.replace( "<", "&lt;" );
-    textValue = textValue.replace( ">", "&gt;" );
-    textValue = textValue.replace( "\"", "&quot;" );
-    textValue = textValue.replace( "'", "&apos;" );
+    # Most values have nothing to escape, the search is cheaper than translating them
+    if XML_SPECIAL_CHARS.search( textValue ):
+        return textValue.translate( XML_ESCAPE_TABLE )
     return textValue
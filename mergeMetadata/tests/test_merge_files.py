@@ -0,0 +1,55 @@
+import os
+import shutil
+import tempfile
+import unittest
+from modules.merger.mergeFiles import isSameContent
+
+PROFILE = '''<?xml version="1.0" encoding="UTF-8"?>
+<Profile xmlns="http://soap.sforce.com/2006/04/metadata">
+    <custom>false</custom>
+    <description>{description}</description>
+    <fieldPermissions>
+        <editable>true</editable>
+        <field>Account.Name__c</field>
+    </fieldPermissions>
+</Profile>
+'''
+
+
+class TestIsSameContent(unittest.TestCase):
+
+	def setUp(self):
+		self.folder = tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree( self.folder )
+
+	def writeFile(self, fileName, content):
+		filePath = os.path.join( self.folder, fileName )
+		with open( filePath, 'w', encoding='utf-8' ) as fileToWrite:
+			fileToWrite.write( content )
+		return filePath
+
+	def testSameFile(self):
+		localPath		= self.writeFile( 'local.profile', PROFILE.format( description='Sales' ) )
+		retrievedPath	= self.writeFile( 'retrieved.profile', PROFILE.format( description='Sales' ) )
+		self.assertTrue( isSameContent( localPath, retrievedPath ) )
+
+	def testIndentationOnly(self):
+		localPath		= self.writeFile( 'local.profile', PROFILE.format( description='Sales' ) )
+		retrievedPath	= self.writeFile( 'retrieved.profile', PROFILE.format( description='Sales' ).replace( '    ', '\t' ) )
+		self.assertTrue( isSameContent( localPath, retrievedPath ) )
+
+	def testTrailingSpaceInValue(self):
+		localPath		= self.writeFile( 'local.profile', PROFILE.format( description='Sales' ) )
+		retrievedPath	= self.writeFile( 'retrieved.profile', PROFILE.format( description='Sales ' ) )
+		self.assertFalse( isSameContent( localPath, retrievedPath ) )
+
+	def testLeadingSpaceInValue(self):
+		localPath		= self.writeFile( 'local.profile', PROFILE.format( description='Sales' ) )
+		retrievedPath	= self.writeFile( 'retrieved.profile', PROFILE.format( description=' Sales' ) )
+		self.assertFalse( isSameContent( localPath, retrievedPath ) )
+
+
+if __name__ == '__main__':
+	unittest.main()
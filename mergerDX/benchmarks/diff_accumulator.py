@@ -0,0 +1,96 @@
+''' Memory benchmark of DiffAccumulator against the previous dict of sets of joined apinames
+
+    Usage: python benchmarks/diff_accumulator.py [-n CHANGES]
+'''
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert( 0, os.path.dirname( os.path.dirname( os.path.realpath( __file__ ) ) ) )
+
+from modules.utils.models import DiffAccumulator
+
+METADATA_TYPES = [
+    ( 'CustomLabels', 'CustomLabels', 'Label' ),
+    ( 'Workflow', 'Account', 'workflowRule' ),
+    ( 'Workflow', 'Opportunity', 'fieldUpdate' ),
+    ( 'SharingRules', 'Case', 'sharingCriteriaRules' ),
+    ( 'AssignmentRules', 'Lead', 'assignmentRule' )
+]
+
+
+def legacyAddValueToMapDiffs(xmlName, status, apiname, mapDiffs):
+    if not xmlName in mapDiffs:
+        mapDiffs[ xmlName ] = {}
+    if not status in mapDiffs[xmlName]:
+        mapDiffs[ xmlName ][ status ] = set()
+    mapDiffs[ xmlName ][ status ].add( apiname )
+
+
+def legacyAddFileToDiffs(mapDiffs, xmlName, status, apiname):
+    apiname         = apiname.replace( '-meta.xml', '' )
+    apiname         = '.'.join( apiname.split( '.' )[ 0 : -1 ] )
+    legacyAddValueToMapDiffs( xmlName, status, apiname, mapDiffs )
+
+
+def iterChanges(changes):
+    ''' Synthetic element level changes, names are built on the fly as the parser does '''
+    for index in range( changes ):
+        xmlName, objectName, tagName = METADATA_TYPES[ index % len( METADATA_TYPES ) ]
+        yield xmlName, 'MAD'[ index % 3 ], objectName, f'{tagName}_{index:06d}', tagName
+
+
+def buildLegacy(changes):
+    mapDiffs = {}
+    for xmlName, status, objectName, fullName, tagName in iterChanges( changes ):
+        legacyAddFileToDiffs( mapDiffs, xmlName, status, f'{objectName}.{fullName}.{tagName}' )
+    return mapDiffs
+
+
+def buildAccumulator(changes):
+    mapDiffs = DiffAccumulator()
+    for xmlName, status, objectName, fullName, _ in iterChanges( changes ):
+        mapDiffs.add( xmlName, status, fullName, objectName )
+    return mapDiffs
+
+
+def formatLegacy(mapDiffs):
+    return [ sorted( apinames ) for xmlName in sorted( mapDiffs ) for apinames in mapDiffs[ xmlName ].values() ]
+
+
+def formatAccumulator(mapDiffs):
+    return [ mapDiffs.getApinames( xmlName, status ) for xmlName in mapDiffs.getTypes() for status in mapDiffs.entries[ xmlName ] ]
+
+
+def measure(build, changes):
+    ''' Returns the built map, the bytes it keeps allocated and the build time '''
+    tracemalloc.start()
+    start       = time.perf_counter()
+    mapDiffs    = build( changes )
+    elapsed     = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return mapDiffs, retained, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser( description='Benchmarks the memory used to accumulate the differences of a delta' )
+    parser.add_argument( '-n', '--changes', default=100000, type=int, help='Number of element changes, default=100000' )
+    args = parser.parse_args()
+
+    legacyDiffs, legacyMemory, legacyTime   = measure( buildLegacy, args.changes )
+    currentDiffs, currentMemory, currentTime = measure( buildAccumulator, args.changes )
+    identical = formatLegacy( legacyDiffs ) == formatAccumulator( currentDiffs )
+
+    print( f'Changes    : {args.changes}' )
+    print( f'Legacy     : {legacyMemory / 1024 / 1024:.1f} MB in {legacyTime:.3f}s' )
+    print( f'Current    : {currentMemory / 1024 / 1024:.1f} MB in {currentTime:.3f}s' )
+    print( f'Saved      : {( 1 - currentMemory / legacyMemory ) * 100:.0f}% memory, {legacyTime / currentTime:.2f}x faster' )
+    print( f'Identical  : {identical}' )
+    sys.exit( 0 if identical else 1 )
+
+
+if __name__ == '__main__':
+    main()
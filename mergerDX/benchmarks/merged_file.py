@@ -0,0 +1,151 @@
+''' Micro benchmark of generateMergedFile against the previous string concatenation serializer
+
+    Both serializers run alternately after a warm-up, with the garbage collector paused,
+    and the median of the runs is reported, so a noisy run does not decide the result
+
+    Usage: python benchmarks/merged_file.py [-n ELEMENTS] [-r REPEAT] [-w WARMUP]
+'''
+import gc
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert( 0, os.path.dirname( os.path.dirname( os.path.realpath( __file__ ) ) ) )
+
+from modules.delta_builder import generateMergedFile
+from modules.utils import IDENTATION
+
+
+def legacyXmlEncodeText( textValue ):
+    textValue = textValue.replace( "&", "&amp;" )
+    textValue = textValue.replace( "<", "&lt;" )
+    textValue = textValue.replace( ">", "&gt;" )
+    textValue = textValue.replace( "\"", "&quot;" )
+    textValue = textValue.replace( "'", "&apos;" )
+    return textValue
+
+
+def legacyGenerateMergedFile(rootTag, folder, apiname, deltaFolder, mapResult):
+
+    mergedFile = '<?xml version="1.0" encoding="UTF-8"?>\n'
+    mergedFile += f'<{rootTag} xmlns="http://soap.sforce.com/2006/04/metadata">\n'
+    for tagName in mapResult:
+        if isinstance( mapResult[ tagName ], str ):
+            mergedFile += f'{IDENTATION}<{tagName}>{legacyXmlEncodeText(mapResult[ tagName ])}</{tagName}>\n'
+        else:
+            for fullNameElement in mapResult[ tagName ]:
+                mergedFile += f'{IDENTATION}<{tagName}>\n'
+                for elementTag in mapResult[ tagName ][ fullNameElement ]:
+                    elementValue = mapResult[ tagName ][ fullNameElement ][ elementTag ]
+                    mergedFile += legacyIterateElement( elementValue, elementTag, 2 )
+                mergedFile += f'{IDENTATION}</{tagName}>\n'
+    mergedFile += f'</{rootTag}>'
+
+    os.makedirs( f'{deltaFolder}/{folder}', exist_ok=True )
+    with open( f'{deltaFolder}/{folder}/{apiname}', 'w', encoding='utf-8' ) as resultFile:
+        resultFile.write( mergedFile )
+
+
+def legacyIterateElement( elementValue, elementTag, identationLevel ):
+
+    textValue = ''
+    if type( elementValue ) is str:
+        textValue += f'{IDENTATION*identationLevel}<{elementTag}>{legacyXmlEncodeText(elementValue)}</{elementTag}>\n'
+    elif type( elementValue ) is dict:
+        textValue += f'{IDENTATION*identationLevel}<{elementTag}>\n'
+        for keyTag in sorted( elementValue.keys() ):
+            textValue += legacyIterateElement( elementValue[ keyTag ], keyTag, identationLevel + 1 )
+        textValue += f'{IDENTATION*identationLevel}</{elementTag}>\n'
+    elif type( elementValue ) is list:
+        for elementListValue in elementValue:
+            textValue += f'{IDENTATION*identationLevel}<{elementTag}>\n'
+            for keyTag in sorted( elementListValue.keys() ):
+                textValue += legacyIterateElement( elementListValue[ keyTag ], keyTag, identationLevel + 1 )
+            textValue += f'{IDENTATION*identationLevel}</{elementTag}>\n'
+    else:
+        textValue += f'{IDENTATION*identationLevel}<{elementTag}/>\n'
+    return textValue
+
+
+def buildProfile(elements):
+    ''' Synthetic profile shaped as the mapResult built by compareFiles '''
+    randomizer  = random.Random( 0 )
+    mapResult   = { 'custom' : 'false', 'description' : 'Synthetic <profile> & "benchmark"' }
+
+    fieldPermissions = mapResult[ 'fieldPermissions' ] = {}
+    for index in range( elements * 3 // 5 ):
+        field = f'Object{index % 300}__c.Field{index}__c'
+        fieldPermissions[ field ] = { 'editable' : randomizer.choice( [ 'true', 'false' ] ), 'field' : field, 'readable' : 'true' }
+
+    classAccesses = mapResult[ 'classAccesses' ] = {}
+    for index in range( elements // 5 ):
+        classAccesses[ f'Class{index}' ] = { 'apexClass' : f'Class{index}', 'enabled' : 'true' }
+
+    layoutAssignments = mapResult[ 'layoutAssignments' ] = {}
+    for index in range( elements // 10 ):
+        layout = f'Object{index}__c-Object {index} & Layout'
+        layoutAssignments[ layout ] = { 'layout' : layout, 'recordType' : f'Object{index}__c.Type\'{index}\'' }
+
+    loginIpRanges = mapResult[ 'loginIpRanges' ] = {}
+    for index in range( elements - len( fieldPermissions ) - len( classAccesses ) - len( layoutAssignments ) ):
+        loginIpRanges[ f'range{index}' ] = { 'description' : None, 'ranges' : [ { 'endAddress' : f'10.0.{index % 256}.255', 'startAddress' : f'10.0.{index % 256}.0' } ] * 2 }
+    return mapResult
+
+
+def timeSerializer(serializer, mapResult, deltaFolder, apiname):
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        serializer( 'Profile', 'profiles', apiname, deltaFolder, mapResult )
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def timeSerializers(mapResult, deltaFolder, repeat, warmup):
+    ''' Returns the legacy and current timings, the serializers run alternately so
+        both see the same state of the machine '''
+    legacyTimings   = []
+    currentTimings  = []
+    for run in range( warmup + repeat ):
+        legacyTime  = timeSerializer( legacyGenerateMergedFile, mapResult, deltaFolder, 'Legacy.profile' )
+        currentTime = timeSerializer( generateMergedFile, mapResult, deltaFolder, 'Current.profile' )
+        if run >= warmup:
+            legacyTimings.append( legacyTime )
+            currentTimings.append( currentTime )
+    return legacyTimings, currentTimings
+
+
+def main():
+    parser = argparse.ArgumentParser( description='Benchmarks the merged file serializer' )
+    parser.add_argument( '-n', '--elements', default=50000, type=int, help='Number of elements of the synthetic profile, default=50000' )
+    parser.add_argument( '-r', '--repeat', default=15, type=int, help='Number of measured runs, the median is reported, default=15' )
+    parser.add_argument( '-w', '--warmup', default=2, type=int, help='Number of runs before measuring, default=2' )
+    args = parser.parse_args()
+
+    mapResult = buildProfile( args.elements )
+    with tempfile.TemporaryDirectory() as deltaFolder:
+        legacyTimings, currentTimings = timeSerializers( mapResult, deltaFolder, args.repeat, args.warmup )
+        legacyTime  = statistics.median( legacyTimings )
+        currentTime = statistics.median( currentTimings )
+        ratios      = sorted( legacy / current for legacy, current in zip( legacyTimings, currentTimings ) )
+
+        with open( f'{deltaFolder}/profiles/Legacy.profile', 'rb' ) as legacyFile, open( f'{deltaFolder}/profiles/Current.profile', 'rb' ) as currentFile:
+            legacyOutput    = legacyFile.read()
+            identical       = legacyOutput == currentFile.read()
+
+    print( f'Elements   : {args.elements} ({len( legacyOutput ) / 1024 / 1024:.1f} MB)' )
+    print( f'Legacy     : {legacyTime:.3f}s median of {args.repeat} runs ({min( legacyTimings ):.3f}s - {max( legacyTimings ):.3f}s)' )
+    print( f'Current    : {currentTime:.3f}s median of {args.repeat} runs ({min( currentTimings ):.3f}s - {max( currentTimings ):.3f}s)' )
+    print( f'Speedup    : {legacyTime / currentTime:.2f}x (per run {ratios[ 0 ]:.2f}x - {ratios[ -1 ]:.2f}x)' )
+    print( f'Identical  : {identical}' )
+    sys.exit( 0 if identical else 1 )
+
+
+if __name__ == '__main__':
+    main()
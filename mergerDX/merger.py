@@ -3,6 +3,7 @@ import sys
 
 from modules.delta_builder import buildDelta, mergeDelta
 from modules.git.utils import is_commit_user_configured, is_git_repository, is_valid_remote
+from modules.parser.parse_cache import MEGABYTE, ParseCache
 from modules.utils import FATAL_LINE, SUCCESS_LINE, WARNING_LINE
 from modules.utils.argparser import parseArgs
 from modules.utils.exceptions import ( CommitUserNotConfigured, InvalidRemoteSpecified, MergerException, 
@@ -35,14 +36,15 @@ def main():
         sys.exit( 0 )
     try:
         prevalidations( args )
+        parseCache = ParseCache( args.cache_dir, args.cache_size * MEGABYTE ) if args.cache else None
         if args.option == 'merge_delta':
             mergeDelta( args.source, args.target, args.remote, args.fetch, args.reset, args.delta_folder,
-                        args.source_folder, args.api_version, args.describe )
+                        args.source_folder, args.api_version, args.describe, args.jobs, parseCache, args.link_mode, args.dedup, args.include, args.exclude )
             print( f'{SUCCESS_LINE} Build Delta Package Finished correctly' )
 
         elif args.option == 'build_delta':
             buildDelta( args.source, args.target, args.remote, args.fetch, args.delta_folder, args.source_folder,
-                        args.api_version, args.describe )
+                        args.api_version, args.describe, args.jobs, parseCache, args.link_mode, args.checkout, args.dedup, args.include, args.exclude, args.incremental )
 
     except MergerExceptionWarning as exception:
         print( f'{WARNING_LINE} {exception}, finished with warnings...' )
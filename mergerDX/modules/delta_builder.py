@@ -1,17 +1,47 @@
 ''' Delta Builder '''
 import os
-import re
-import glob
+import itertools
 import json
+import hashlib
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 
+from modules.delta_manifest import DeltaManifest
 from modules.git import checkout, fetch, prepare_and_merge
-from modules.parser.parse_file import parseFile
-from modules.utils import INFO_TAG, call_subprocess, getXmlNamesFromJSON, IDENTATION, PARSEABLE_METADATA
+from modules.git.models import BlobReader, DiffReader
+from modules.parser.parse_file import getRecordData, getRecordText, iterParseFile, parseFileDigests
+from modules.utils import ERROR_TAG, INFO_TAG, getXmlNamesFromJSON, IDENTATION, PARSEABLE_METADATA, print_output
+from modules.utils.copier import FileCopier, GitObjectCopier, ObjectStore
 from modules.utils.exceptions import NoDifferencesException
-from modules.utils.utilities import generateDestructive, xmlEncodeText
-
-def mergeDelta( source, target, remote, doFetch, reset, deltaFolder, sourceFolder, apiVersion, describePath='describe.log'):
+from modules.utils.models import DiffAccumulator, PathClassifier
+from modules.utils.utilities import generateManifests, xmlEncodeText
+
+workerBlobReader = None
+
+# Child elements of the parseable files and the type they are deployed with, labels are the only ones without the file name
+MAP_CHILD_XML_NAMES = {
+    'labels'                : 'CustomLabel',
+    'alerts'                : 'WorkflowAlert',
+    'fieldUpdates'          : 'WorkflowFieldUpdate',
+    'flowActions'           : 'WorkflowFlowAction',
+    'knowledgePublishes'    : 'WorkflowKnowledgePublish',
+    'outboundMessages'      : 'WorkflowOutboundMessage',
+    'rules'                 : 'WorkflowRule',
+    'send'                  : 'WorkflowSend',
+    'tasks'                 : 'WorkflowTask',
+    'sharingCriteriaRules'  : 'SharingCriteriaRule',
+    'sharingGuestRules'     : 'SharingGuestRule',
+    'sharingOwnerRules'     : 'SharingOwnerRule',
+    'sharingTerritoryRules' : 'SharingTerritoryRule',
+    'assignmentRule'        : 'AssignmentRule',
+    'autoResponseRule'      : 'AutoResponseRule',
+    'escalationRule'        : 'EscalationRule',
+    'matchingRules'         : 'MatchingRule',
+    'managedTopic'          : 'ManagedTopic'
+}
+
+
+def mergeDelta( source, target, remote, doFetch, reset, deltaFolder, sourceFolder, apiVersion, describePath='describe.log', jobs=1, parseCache=None, linkMode='copy', dedup=False, include=None, exclude=None):
     ''' Builds delta package in the destination folder '''
 
     print( f'{INFO_TAG} Clean up target folder \'{deltaFolder}\'' )
@@ -24,19 +54,25 @@ def mergeDelta( source, target, remote, doFetch, reset, deltaFolder, sourceFolde
     print( f'{INFO_TAG} Preparing to merge \'{source}\' into \'{target}\'' )
     prepare_and_merge( source, target, remote, doFetch, reset )
 
-    mapDiffs = handleMerge( sourceFolder, 'HEAD', 'HEAD~1', deltaFolder, apiVersion, xmlNames )
+    mapDiffs = handleMerge( sourceFolder, 'HEAD', 'HEAD~1', deltaFolder, apiVersion, xmlNames, jobs, parseCache, FileCopier( linkMode, getObjectStore( deltaFolder, dedup ) ), include, exclude )
 
-    generateDestructive( mapDiffs, apiVersion )
+    generateManifests( mapDiffs, apiVersion )
 
     print( f'\n{INFO_TAG} Generated Delta' )
 
 
-def buildDelta(sourceRef, targetRef, remote, doFetch, deltaFolder, sourceFolder, apiVersion, describePath='describe.log'):
-    ''' Builds delta package in the destination folder '''
+def buildDelta(sourceRef, targetRef, remote, doFetch, deltaFolder, sourceFolder, apiVersion, describePath='describe.log', jobs=1, parseCache=None, linkMode='copy', doCheckout=True, dedup=False, include=None, exclude=None, incremental=False):
+    ''' Builds delta package in the destination folder, without doCheckout the files
+        are read from the git objects of the source ref instead of the working tree.
+        In incremental mode the delta folder of the previous build is updated when possible '''
 
-    print( f'{INFO_TAG} Clean up target folder \'{deltaFolder}\'' )
-    shutil.rmtree( deltaFolder, ignore_errors=True, onerror=None )
-    os.makedirs( deltaFolder )
+    if incremental:
+        deltaManifest = DeltaManifest( deltaFolder, getManifestOptions( sourceFolder, describePath, include, exclude ) )
+    else:
+        deltaManifest = None
+        print( f'{INFO_TAG} Clean up target folder \'{deltaFolder}\'' )
+        shutil.rmtree( deltaFolder, ignore_errors=True, onerror=None )
+        os.makedirs( deltaFolder )
 
     print( f'{INFO_TAG} Extracting metadata types from \'{describePath}\'' )
     xmlNames = getXmlNamesFromJSON( describePath )
@@ -47,42 +83,123 @@ def buildDelta(sourceRef, targetRef, remote, doFetch, deltaFolder, sourceFolder,
     else:
         print( f'{INFO_TAG} Not fetching, using current local status' )
 
-    print( f'{INFO_TAG} Checking out source ref \'{sourceRef}\'' )
-    checkout( sourceRef, remote, reset=False)
+    if doCheckout:
+        print( f'{INFO_TAG} Checking out source ref \'{sourceRef}\'' )
+        checkout( sourceRef, remote, reset=False)
+        fileCopier = FileCopier( linkMode, getObjectStore( deltaFolder, dedup ) )
+    else:
+        print( f'{INFO_TAG} Not checking out, reading files from source ref \'{sourceRef}\'' )
+        fileCopier = GitObjectCopier( sourceRef, getObjectStore( deltaFolder, dedup ) )
 
-    mapDiffs = handleMerge( sourceFolder, sourceRef, targetRef, deltaFolder, apiVersion, xmlNames )
+    mapDiffs = handleMerge( sourceFolder, sourceRef, targetRef, deltaFolder, apiVersion, xmlNames, jobs, parseCache, fileCopier, include, exclude, deltaManifest )
 
-    generateDestructive( mapDiffs, apiVersion )
+    generateManifests( mapDiffs, apiVersion )
 
     print( f'\n{INFO_TAG} Generated Delta' )
 
 
-def handleMerge(sourceFolder, sourceRef, targetRef, deltaFolder, apiVersion, xmlNames):
+def handleMerge(sourceFolder, sourceRef, targetRef, deltaFolder, apiVersion, xmlNames, jobs=1, parseCache=None, fileCopier=None, include=None, exclude=None, deltaManifest=None):
+
+    projectNames    = getProjectNames()
+    pathspecs       = getPathspecs( sourceFolder, projectNames, include, exclude )
+
+    if deltaManifest:
+        deltaManifest.prepare( sourceRef, targetRef, PathClassifier( projectNames, xmlNames, sourceFolder ), pathspecs )
 
     print( f'{INFO_TAG} Getting differences' )
-    differences = getDifferences( sourceFolder, sourceRef, targetRef )
+    differences     = getDifferences( sourceFolder, sourceRef, targetRef, pathspecs )
 
-    print( f'{INFO_TAG} Handling a total of {len( differences )} differences' )
-    projectNames    = getProjectNames()
-    return handleDifferences( differences, projectNames, deltaFolder, apiVersion, xmlNames, sourceFolder, sourceRef, targetRef )
+    print( f'{INFO_TAG} Handling differences as they are read' )
+    fileCopier      = fileCopier or FileCopier()
+    try:
+        mapDiffs    = handleDifferences( differences, projectNames, deltaFolder, apiVersion, xmlNames, sourceFolder, sourceRef, targetRef, jobs, parseCache, fileCopier, deltaManifest )
+    finally:
+        fileCopier.close()
 
+    if deltaManifest:
+        mapDiffs = deltaManifest.getMapDiffs()
+        deltaManifest.save()
 
-def getDifferences(sourceFolder, source, target):
-    ''' Extract the differences between two references '''
+    if parseCache:
+        parseCache.evict()
+    return mapDiffs
 
-    diffCommand = f'git diff --name-status {target} {source}'
-    output, _   = call_subprocess( diffCommand)
 
-    if sourceFolder:
-        regexString = r'([A-Z0-9]+)\t*({}\/.+)'.format( sourceFolder )
-    else:
-        regexString = r'([A-Z0-9]+)\t*(.+\/.+)'
+def getManifestOptions(sourceFolder, describePath, include, exclude):
+    ''' Options that change the content of the delta, a previous build is only reused when they match '''
+    with open( describePath, 'rb' ) as describeFile:
+        describeHash = hashlib.sha1( describeFile.read() ).hexdigest()
+    return { 'sourceFolder' : sourceFolder, 'describe' : describeHash, 'include' : include, 'exclude' : exclude }
+
 
-    differences = re.findall( regexString, output )
+def getObjectStore(deltaFolder, dedup):
+    ''' With dedup every distinct file is written once and hard linked into the delta folder '''
+    return ObjectStore( deltaFolder ) if dedup else None
 
-    if not differences:
+
+def getPathspecs(sourceFolder, projectNames, include=None, exclude=None):
+    ''' Pathspecs that limit git diff to the package directories inside the source folder,
+        include globs replace the package directories and exclude globs are always applied.
+        Every pathspec is relative to the top of the repository as the diff paths are '''
+
+    if include:
+        pathspecs = [ f':(top,glob){pattern}' for pattern in include ]
+    else:
+        pathspecs = []
+        for projectName in projectNames:
+            projectPath = os.path.normpath( projectName )
+            if sourceFolder and projectPath == '.':
+                projectPath = sourceFolder
+            elif sourceFolder and not projectPath.startswith( f'{sourceFolder}/' ):
+                projectPath = f'{sourceFolder}/{projectPath}'
+            elif projectPath == '.':
+                pathspecs = []
+                break
+            pathspecs.append( f':(top){projectPath}' )
+        if not pathspecs and sourceFolder:
+            pathspecs = [ f':(top){sourceFolder}' ]
+
+    if exclude:
+        if not pathspecs:
+            pathspecs = [ ':(top)' ]
+        pathspecs += [ f':(top,glob,exclude){pattern}' for pattern in exclude ]
+    return pathspecs
+
+
+def getDifferences(sourceFolder, source, target, pathspecs=None):
+    ''' Extract the differences between two references, they are streamed from git
+        as they are handled so only the first one is read here '''
+
+    differences     = iterDifferences( sourceFolder, DiffReader( target, source, pathspecs ) )
+    firstDifference = next( differences, None )
+
+    if not firstDifference:
         raise NoDifferencesException( sourceFolder )
-    return differences
+    return itertools.chain( [ firstDifference ], differences )
+
+
+def iterDifferences(sourceFolder, diffReader):
+
+    folderPrefix        = f'{sourceFolder}/' if sourceFolder else ''
+    totalDifferences    = 0
+
+    for difference in diffReader:
+        print( f'\t{difference}' )
+        if isInSourceFolder( difference.path, folderPrefix ) or isInSourceFolder( difference.previous_path, folderPrefix ):
+            totalDifferences += 1
+            yield difference
+
+    if diffReader.returncode:
+        print( f'{ERROR_TAG} Subprocess returned non-zero exit status {diffReader.returncode}' )
+        print_output( diffReader.error )
+    print( f'{INFO_TAG} Handled a total of {totalDifferences} differences' )
+
+
+def isInSourceFolder(path, folderPrefix):
+    ''' Without source folder only paths inside a folder are considered '''
+    if not path:
+        return False
+    return path.startswith( folderPrefix ) if folderPrefix else '/' in path
 
 
 def getProjectNames():
@@ -110,24 +227,35 @@ def addChildMetadataToMapDiffs(splittedApiName, mapDiffs, status):
         'fieldSets'         : 'FieldSet',
         'fields'            : 'CustomField'
     }
-    apiname = splittedApiName[ 0 ] + '.' + splittedApiName[ 2 ]
     xmlName = mapChildMetadata[ splittedApiName[ 1 ] ]
-    addValueToMapDiffs( xmlName, status, apiname, mapDiffs )
+    mapDiffs.add( xmlName, status, splittedApiName[ 2 ], splittedApiName[ 0 ] )
+
+
+def addParsedChildToMapDiffs(mapDiffs, xmlName, tagName, status, fullName, objectName):
+    ''' Child elements of a parsed file are listed with their own type, CustomLabel / L1
+        or WorkflowRule / Account.Rule, the parent type is kept for unknown tags '''
+    childXmlName = MAP_CHILD_XML_NAMES.get( tagName )
+    if childXmlName is None:
+        mapDiffs.add( xmlName, status, fullName, objectName )
+    elif childXmlName == 'CustomLabel':
+        mapDiffs.add( childXmlName, status, fullName )
+    else:
+        mapDiffs.add( childXmlName, status, fullName, objectName )
 
 
 def addFileToDiffs(mapDiffs, xmlName, status, apiname):
     apiname         = renameApiName( apiname )
     splittedApiName = apiname.split('/')
     if xmlName == 'AuraDefinitionBundle' or xmlName == 'LightningComponentBundle':
-        addValueToMapDiffs( xmlName, status, splittedApiName[ 0 ], mapDiffs )
+        mapDiffs.add( xmlName, status, splittedApiName[ 0 ] )
     elif xmlName == 'CustomObject':
         numFolders = len( splittedApiName )
         if numFolders == 2:
-            addValueToMapDiffs( xmlName, status, splittedApiName[ 1 ], mapDiffs )
+            mapDiffs.add( xmlName, status, splittedApiName[ 1 ] )
         elif numFolders == 3:
             addChildMetadataToMapDiffs( splittedApiName, mapDiffs, status )
     else:
-        addValueToMapDiffs( xmlName, status, apiname, mapDiffs )
+        mapDiffs.add( xmlName, status, apiname )
     return mapDiffs
 
 
@@ -137,35 +265,47 @@ def renameApiName(apiname):
     return ( '.'.join( splittedApiName[ 0 : -1 ] ) )
 
 
-def addValueToMapDiffs(xmlName, status, apiname, mapDiffs):
-    if not xmlName in mapDiffs:
-        mapDiffs[ xmlName ] = {}
-    if not status in mapDiffs[xmlName]:
-        mapDiffs[ xmlName ][ status ] = set()
-    listElements = mapDiffs[ xmlName ][ status ]
-    mapDiffs[ xmlName ][ status ].add( apiname )
+def handleDifferences(differences, projectNames, deltaFolder, apiVersion, xmlNames, sourceFolder, sourceRef, targetRef, jobs=1, parseCache=None, fileCopier=None, deltaManifest=None):
+    ''' Handles a list of differences copying the files into the delta folder,
+        modified parseable files are compared in a pool of workers when jobs > 1
+        and their target side is read from parseCache when given. With a deltaManifest
+        the differences are recorded per key and unchanged keys are skipped '''
 
+    mapDiffs        = DiffAccumulator()
+    futures         = []
+    pathClassifier  = PathClassifier( projectNames, xmlNames, sourceFolder )
 
-def handleDifferences(differences, projectNames, deltaFolder, apiVersion, xmlNames, sourceFolder, sourceRef, targetRef):
-    ''' Handles a list of differences copying the files into the delta folder '''
+    with BlobReader() as blobReader:
+        executor = ProcessPoolExecutor( max_workers=jobs, initializer=initWorker ) if jobs > 1 else None
+        try:
+            handleDifferencesLoop( differences, pathClassifier, deltaFolder, sourceRef, targetRef, mapDiffs, blobReader, parseCache, fileCopier, executor, futures, deltaManifest )
 
-    mapDiffs = {}
+            # Results are merged in submission order so the output does not depend on scheduling
+            for fileDiffs, future in futures:
+                fileDiffs.update( future.result() )
+        finally:
+            # Workers inherit the blob reader pipes, they must exit before the reader is closed
+            if executor:
+                executor.shutdown()
 
-    for status, filename in differences:
+    return mapDiffs
 
-        isMetadataFile = True
-        for projectName in projectNames:
-            if projectName not in filename:
-                isMetadataFile = False
-        if not isMetadataFile:
-            continue
 
-        if status.startswith('R'):
-            handleRename( sourceFolder, filename, deltaFolder, xmlNames, mapDiffs )
+def handleDifferencesLoop(differences, pathClassifier, deltaFolder, sourceRef, targetRef, mapDiffs, blobReader, parseCache, fileCopier, executor, futures, deltaManifest=None):
+
+    for difference in differences:
+
+        status      = difference.status
+        filename    = difference.path
+        if status == 'R':
+            handleRename( pathClassifier, difference, deltaFolder, mapDiffs, fileCopier, deltaManifest )
         else:
-            folder, apiname, srcFolder  = splitFolderApiname( sourceFolder, filename )
-            xmlDefinition               = xmlNames.get( folder, None )
+            classification  = pathClassifier.classify( filename )
+            fileDiffs       = getFileDiffs( mapDiffs, deltaManifest, classification )
+            if not classification or fileDiffs is None:
+                continue
 
+            srcFolder, folder, xmlDefinition, apiname = classification
             if not xmlDefinition:
                 print( f'Warning : {folder} not in describe' )
                 continue
@@ -175,235 +315,242 @@ def handleDifferences(differences, projectNames, deltaFolder, apiVersion, xmlNam
             xmlName             = getattr( xmlDefinition, "xmlName" )
 
             if status == 'A':
-                handleCreation( srcFolder, folder, apiname, deltaFolder, hasMetaFile, mapDiffs, xmlName, status )
+                handleCreation( srcFolder, folder, apiname, deltaFolder, hasMetaFile, fileDiffs, xmlName, status, fileCopier )
+            elif status == 'M' and executor and folder in PARSEABLE_METADATA:
+                futures.append( ( fileDiffs, executor.submit( parseAndCompare, folder, apiname, filename, deltaFolder, sourceRef, targetRef, xmlName, status, parseCache ) ) )
             elif status == 'M':
-                handleModification( srcFolder, folder, apiname, filename, deltaFolder, sourceRef, targetRef, hasMetaFile, listChildObjects, mapDiffs, xmlName, status )
+                handleModification( srcFolder, folder, apiname, filename, deltaFolder, sourceRef, targetRef, hasMetaFile, listChildObjects, fileDiffs, xmlName, status, blobReader, parseCache, fileCopier )
             elif status == 'D':
-                handleDeletion( mapDiffs, xmlName, status, apiname )
+                handleDeletion( fileDiffs, xmlName, status, apiname )
 
-    return mapDiffs
 
+def getFileDiffs(mapDiffs, deltaManifest, classification):
+    ''' Map where the differences of a path are added, None if the path is not handled again '''
+    return deltaManifest.getDiffs( classification ) if deltaManifest else mapDiffs
 
-def handleRename(sourceFolder, filename, deltaFolder, xmlNames, mapDiffs):
 
-    deletedFile, addedFile      = filename.split( '\t' )
+def initWorker():
+    ''' Opens a blob reader for each worker of the pool '''
+    global workerBlobReader
+    workerBlobReader = BlobReader()
 
-    folder, apiname, srcFolder  = splitFolderApiname( sourceFolder, addedFile )
-    xmlDefinition               = xmlNames.get( folder, None )
-    xmlName                     = getattr( xmlDefinition, "xmlName" )
-    if not xmlDefinition:
-        print( f'Warning : {folder} not in describe' )
-    else:
-        hasMetaFile = getattr( xmlDefinition, "hasMetadata" )
-        handleCreation(srcFolder, folder, apiname, deltaFolder, hasMetaFile, mapDiffs, xmlName, 'A')
-
-    folder, apiname, srcFolder  = splitFolderApiname( sourceFolder, deletedFile )
-    xmlDefinition               = xmlNames.get( folder, None )
-    xmlName                     = getattr( xmlDefinition, "xmlName" )
-    if not xmlDefinition:
-        print( f'Warning : {folder} not in describe' )
-    else:
-        handleDeletion( mapDiffs, xmlName, 'D', apiname )
+
+def parseAndCompare(folder, apiname, filename, deltaFolder, sourceRef, targetRef, xmlName, status, parseCache=None):
+    ''' Worker entry point, returns the differences found in a single parseable file '''
+    fileDiffs = DiffAccumulator()
+    handleParseableModification( folder, apiname, filename, deltaFolder, sourceRef, targetRef, fileDiffs, xmlName, status, workerBlobReader, parseCache )
+    return fileDiffs
+
+
+def handleRename(pathClassifier, difference, deltaFolder, mapDiffs, fileCopier=None, deltaManifest=None):
+
+    deletedFile, addedFile  = difference.previous_path, difference.path
+
+    classification          = pathClassifier.classify( addedFile )
+    fileDiffs               = getFileDiffs( mapDiffs, deltaManifest, classification )
+    if classification and fileDiffs is not None:
+        srcFolder, folder, xmlDefinition, apiname = classification
+        if not xmlDefinition:
+            print( f'Warning : {folder} not in describe' )
+        else:
+            hasMetaFile = getattr( xmlDefinition, "hasMetadata" )
+            xmlName     = getattr( xmlDefinition, "xmlName" )
+            handleCreation(srcFolder, folder, apiname, deltaFolder, hasMetaFile, fileDiffs, xmlName, 'A', fileCopier )
+
+    classification          = pathClassifier.classify( deletedFile )
+    fileDiffs               = getFileDiffs( mapDiffs, deltaManifest, classification )
+    if classification and fileDiffs is not None:
+        _, folder, xmlDefinition, apiname = classification
+        if not xmlDefinition:
+            print( f'Warning : {folder} not in describe' )
+        else:
+            handleDeletion( fileDiffs, getattr( xmlDefinition, "xmlName" ), 'D', apiname )
 
 
-def handleCreation(srcFolder, folder, apiname, deltaFolder, hasMetaFile, mapDiffs, xmlName, status):
+def handleCreation(srcFolder, folder, apiname, deltaFolder, hasMetaFile, mapDiffs, xmlName, status, fileCopier=None):
     addFileToDiffs( mapDiffs, xmlName, status, apiname )
-    copyFiles( srcFolder, folder, apiname, deltaFolder, hasMetaFile )
+    copyFiles( srcFolder, folder, apiname, deltaFolder, hasMetaFile, fileCopier )
 
 
-def handleModification(srcFolder, folder, apiname, filename, deltaFolder, sourceRef, targetRef, hasMetaFile, listChildObjects, mapDiffs, xmlName, status):
+def handleModification(srcFolder, folder, apiname, filename, deltaFolder, sourceRef, targetRef, hasMetaFile, listChildObjects, mapDiffs, xmlName, status, blobReader=None, parseCache=None, fileCopier=None):
 
     if folder in PARSEABLE_METADATA:
-        print( f'parse file - {filename}')
-        rootTag, mapComponentsNew = parseFile( f'{filename}', sourceRef )
-        rootTag, mapComponentsOld = parseFile( f'{filename}', targetRef )
-        mapResult = compareFiles( mapComponentsNew, mapComponentsOld, mapDiffs, apiname, xmlName )
-        if mapResult.keys():
-            generateMergedFile( rootTag, folder, apiname, deltaFolder, mapResult )
-            if folder == 'profiles':
-                addFileToDiffs( mapDiffs, xmlName, status, apiname )
+        handleParseableModification( folder, apiname, filename, deltaFolder, sourceRef, targetRef, mapDiffs, xmlName, status, blobReader, parseCache )
     else:
         addFileToDiffs( mapDiffs, xmlName, status, apiname )
-        copyFiles( srcFolder, folder, apiname, deltaFolder, hasMetaFile )
+        copyFiles( srcFolder, folder, apiname, deltaFolder, hasMetaFile, fileCopier )
 
 
-def compareFiles(mapComponentsNew, mapComponentsOld, mapDiffs, apiname, xmlName):
-    mapResult = {}
-    objectName = apiname.split( '.' )[ 0 ]
-    for tagName in mapComponentsNew:
-        if tagName in mapComponentsOld:
-            if mapComponentsNew[ tagName ] != mapComponentsOld[ tagName ]:
-                if isinstance( mapComponentsNew[ tagName ], str ):
-                    mapResult[ tagName ] = mapComponentsNew[ tagName ]
-                else:
-                    for elementName in mapComponentsNew[ tagName ]:
-                        if elementName in mapComponentsOld[ tagName ]:
-                            if mapComponentsNew[ tagName ][ elementName ] != mapComponentsOld[ tagName ][ elementName ]:
-                                if xmlName != 'Profile':
-                                    addFileToDiffs( mapDiffs, xmlName, 'M', f'{objectName}.{elementName}.{tagName}' )
-                                if not tagName in mapResult:
-                                    mapResult[ tagName ] = {}
-                                if not elementName in mapResult[ tagName ]:
-                                    mapResult[ tagName ][ elementName ] = {}
-                                mapResult[ tagName ][ elementName ] = mapComponentsNew[ tagName ][ elementName ]
-                        else:
-                            if xmlName != 'Profile':
-                                addFileToDiffs( mapDiffs, xmlName, 'A', f'{objectName}.{elementName}.{tagName}' )
-                            if not tagName in mapResult:
-                                mapResult[ tagName ] = {}
-                            if not elementName in mapResult[ tagName ]:
-                                mapResult[ tagName ][ elementName ] = {}
-                            mapResult[ tagName ][ elementName ] = mapComponentsNew[ tagName ][ elementName ]
-        else:
-            mapResult[ tagName ] = mapComponentsNew[ tagName ]
-            if xmlName != 'Profile':
-                for elementName in mapComponentsNew[ tagName ]:
-                    addFileToDiffs( mapDiffs, xmlName, 'A', f'{objectName}.{elementName}.{tagName}' )
+def handleParseableModification(folder, apiname, filename, deltaFolder, sourceRef, targetRef, mapDiffs, xmlName, status, blobReader=None, parseCache=None):
+
+    print( f'parse file - {filename}')
+    rootTag, mapDigestsOld  = parseFileDigests( f'{filename}', targetRef, blobReader, parseCache )
+    rootTag, recordsNew     = iterParseFile( f'{filename}', sourceRef, blobReader )
+    mapResult = compareFiles( recordsNew, mapDigestsOld, mapDiffs, apiname, xmlName )
+    if mapResult.keys():
+        generateMergedFile( rootTag, folder, apiname, deltaFolder, mapResult )
+        if folder == 'profiles':
+            addFileToDiffs( mapDiffs, xmlName, status, apiname )
+
+
+def compareFiles(recordsNew, mapDigestsOld, mapDiffs, apiname, xmlName):
+    ''' Compares the records of the new file with the digests of the old one,
+        only the children that changed are materialized into the result '''
+    mapChanged  = {}
+    mapNewTexts = {}
+    mapNewKeys  = {}
+    objectName  = apiname.split( '.' )[ 0 ]
+
+    for tagName, fullName, digest, elementBytes in recordsNew:
+        if not tagName in mapNewKeys:
+            mapNewKeys[ tagName ] = set()
+
+        if fullName is None:
+            mapNewTexts[ tagName ] = getRecordText( elementBytes )
+            continue
+
+        mapNewKeys[ tagName ].add( fullName )
+        mapDigestsTag = mapDigestsOld.get( tagName, {} )
+        if fullName in mapDigestsTag and mapDigestsTag[ fullName ] == digest:
+            continue
 
         if xmlName != 'Profile':
-            oldTagKeys = mapComponentsOld[ tagName ].keys() if tagName in mapComponentsOld else set()
-            newTagKeys = mapComponentsNew[ tagName ].keys() if tagName in mapComponentsNew else set()
-            for elementName in list( oldTagKeys - newTagKeys ):
-                handleDeletion( mapDiffs, xmlName, 'D', f'{objectName}.{elementName}.{tagName}' )
+            status = 'M' if fullName in mapDigestsTag else 'A'
+            addParsedChildToMapDiffs( mapDiffs, xmlName, tagName, status, fullName, objectName )
+        if not tagName in mapChanged:
+            mapChanged[ tagName ] = {}
+        mapChanged[ tagName ][ fullName ] = getRecordData( elementBytes )
 
-    return mapResult
+    for tagName, textValue in mapNewTexts.items():
+        if mapDigestsOld.get( tagName ) != textValue:
+            mapChanged[ tagName ] = textValue
 
+    if xmlName != 'Profile':
+        for tagName in mapNewKeys:
+            if isinstance( mapDigestsOld.get( tagName ), dict ):
+                for elementName in mapDigestsOld[ tagName ].keys() - mapNewKeys[ tagName ]:
+                    addParsedChildToMapDiffs( mapDiffs, xmlName, tagName, 'D', elementName, objectName )
 
-def generateMergedFile(rootTag, folder, apiname, deltaFolder, mapResult):
+    # Tags keep the order of their first appearance in the new file
+    return { tagName : mapChanged[ tagName ] for tagName in mapNewKeys if tagName in mapChanged }
 
-    mergedFile = '<?xml version="1.0" encoding="UTF-8"?>\n'
-    mergedFile += f'<{rootTag} xmlns="http://soap.sforce.com/2006/04/metadata">\n'
-    for tagName in mapResult:
-        if isinstance( mapResult[ tagName ], str ):
-            mergedFile += f'{IDENTATION}<{tagName}>{xmlEncodeText(mapResult[ tagName ])}</{tagName}>\n'
-        else:
-            for fullNameElement in mapResult[ tagName ]:
-                mergedFile += f'{IDENTATION}<{tagName}>\n'
-                for elementTag in mapResult[ tagName ][ fullNameElement ]:
-                    elementValue = mapResult[ tagName ][ fullNameElement ][ elementTag ]
-                    mergedFile += iterateElement( elementValue, elementTag, 2 )
-                mergedFile += f'{IDENTATION}</{tagName}>\n'
-    mergedFile += f'</{rootTag}>'
+
+def generateMergedFile(rootTag, folder, apiname, deltaFolder, mapResult):
+    ''' Writes the merged file, every child of the root is serialized into a
+        list of parts that is flushed to the file before the next one '''
 
     makeDirs( f'{deltaFolder}/{folder}' )
+    # A linked copy of the file must be replaced instead of written through
+    if os.path.lexists( f'{deltaFolder}/{folder}/{apiname}' ):
+        os.remove( f'{deltaFolder}/{folder}/{apiname}' )
     with open( f'{deltaFolder}/{folder}/{apiname}', 'w', encoding='utf-8' ) as resultFile:
-        resultFile.write( mergedFile )
+        resultFile.write( '<?xml version="1.0" encoding="UTF-8"?>\n' )
+        resultFile.write( f'<{rootTag} xmlns="http://soap.sforce.com/2006/04/metadata">\n' )
+        for tagName, tagValue in mapResult.items():
+            if isinstance( tagValue, str ):
+                resultFile.write( f'{IDENTATION}<{tagName}>{xmlEncodeText( tagValue )}</{tagName}>\n' )
+                continue
+            for elementData in tagValue.values():
+                parts = [ f'{IDENTATION}<{tagName}>\n' ]
+                for elementTag, elementValue in elementData.items():
+                    iterateElement( parts, elementValue, elementTag, 2 )
+                parts.append( f'{IDENTATION}</{tagName}>\n' )
+                resultFile.write( ''.join( parts ) )
+        resultFile.write( f'</{rootTag}>' )
 
 
-def iterateElement( elementValue, elementTag, identationLevel ):
+def iterateElement( parts, elementValue, elementTag, identationLevel ):
+    ''' Appends the serialization of the element to the list of parts '''
 
-    textValue = ''
+    identation = IDENTATION * identationLevel
     if type( elementValue ) is str:
-        textValue += f'{IDENTATION*identationLevel}<{elementTag}>{xmlEncodeText(elementValue)}</{elementTag}>\n'
+        parts.append( f'{identation}<{elementTag}>{xmlEncodeText( elementValue )}</{elementTag}>\n' )
     elif type( elementValue ) is dict:
-        textValue += f'{IDENTATION*identationLevel}<{elementTag}>\n'
-        for keyTag in sorted( elementValue.keys() ):
-            textValue += iterateElement( elementValue[ keyTag ], keyTag, identationLevel + 1 )
-        textValue += f'{IDENTATION*identationLevel}</{elementTag}>\n'
+        parts.append( f'{identation}<{elementTag}>\n' )
+        for keyTag in sorted( elementValue ):
+            iterateElement( parts, elementValue[ keyTag ], keyTag, identationLevel + 1 )
+        parts.append( f'{identation}</{elementTag}>\n' )
     elif type( elementValue ) is list:
         for elementListValue in elementValue:
-            textValue += f'{IDENTATION*identationLevel}<{elementTag}>\n'
-            for keyTag in sorted( elementListValue.keys() ):
-                textValue += iterateElement( elementListValue[ keyTag ], keyTag, identationLevel + 1 )
-            textValue += f'{IDENTATION*identationLevel}</{elementTag}>\n'
+            parts.append( f'{identation}<{elementTag}>\n' )
+            for keyTag in sorted( elementListValue ):
+                iterateElement( parts, elementListValue[ keyTag ], keyTag, identationLevel + 1 )
+            parts.append( f'{identation}</{elementTag}>\n' )
     else:
-        textValue += f'{IDENTATION*identationLevel}<{elementTag}/>\n'
-    return textValue
+        parts.append( f'{identation}<{elementTag}/>\n' )
 
 
 def handleDeletion(mapDiffs, xmlName, status, apiname):
     addFileToDiffs( mapDiffs, xmlName, status, apiname )
 
 
-def copyFiles(srcFolder, folder, apiname, deltaFolder, hasMetaFile):
+def copyFiles(srcFolder, folder, apiname, deltaFolder, hasMetaFile, fileCopier=None):
+
+    fileCopier = fileCopier or FileCopier()
 
     if folder in [ 'aura', 'lwc' ]:
         rootFolder = apiname.split( '/' )[ 0 ]
-        copyTree( f'{srcFolder}/{folder}/{rootFolder}', f'{deltaFolder}/{folder}/{rootFolder}' )
+        fileCopier.copyTree( f'{srcFolder}/{folder}/{rootFolder}', f'{deltaFolder}/{folder}/{rootFolder}' )
 
     elif folder == 'staticresources':
         if '/' in apiname:
             rootFolder = apiname.split( '/' )[ 0 ]
             pathFolder = f'{folder}/{rootFolder}'
-            copyTree( f'{srcFolder}/{pathFolder}', f'{deltaFolder}/{pathFolder}' )
-            copyFile( f'{srcFolder}/{pathFolder}.resource-meta.xml', f'{deltaFolder}/{pathFolder}.resource-meta.xml' )
+            fileCopier.copyTree( f'{srcFolder}/{pathFolder}', f'{deltaFolder}/{pathFolder}' )
+            fileCopier.copyFile( f'{srcFolder}/{pathFolder}.resource-meta.xml', f'{deltaFolder}/{pathFolder}.resource-meta.xml' )
         else:
-            makeDirs( f'{deltaFolder}/{folder}' )
-            copyFile( f'{srcFolder}/{folder}/{apiname}', f'{deltaFolder}/{folder}/{apiname}' )
+            fileCopier.makeDirs( f'{deltaFolder}/{folder}' )
+            fileCopier.copyFile( f'{srcFolder}/{folder}/{apiname}', f'{deltaFolder}/{folder}/{apiname}' )
             apiname = apiname.split( '.' )[ 0 ]
-            copyFile( f'{srcFolder}/{folder}/{apiname}.resource-meta.xml', f'{deltaFolder}/{folder}/{apiname}.resource-meta.xml' )
+            fileCopier.copyFile( f'{srcFolder}/{folder}/{apiname}.resource-meta.xml', f'{deltaFolder}/{folder}/{apiname}.resource-meta.xml' )
     elif folder == 'experiences':
         if '/' in apiname:
             rootFolder = apiname.split( '/' )[ 0 ]
             pathFolder = f'{folder}/{rootFolder}'
-            copyTree( f'{srcFolder}/{pathFolder}', f'{deltaFolder}/{pathFolder}' )
-            copyFile( f'{srcFolder}/{pathFolder}.site-meta.xml', f'{deltaFolder}/{pathFolder}.site-meta.xml' )
+            fileCopier.copyTree( f'{srcFolder}/{pathFolder}', f'{deltaFolder}/{pathFolder}' )
+            fileCopier.copyFile( f'{srcFolder}/{pathFolder}.site-meta.xml', f'{deltaFolder}/{pathFolder}.site-meta.xml' )
         else:
-            makeDirs( f'{deltaFolder}/{folder}' )
-            copyFile( f'{srcFolder}/{folder}/{apiname}', f'{deltaFolder}/{folder}/{apiname}' )
+            fileCopier.makeDirs( f'{deltaFolder}/{folder}' )
+            fileCopier.copyFile( f'{srcFolder}/{folder}/{apiname}', f'{deltaFolder}/{folder}/{apiname}' )
             apiname = apiname.split( '.' )[ 0 ]
-            copyFile( f'{srcFolder}/{folder}/{apiname}.site-meta.xml', f'{deltaFolder}/{folder}/{apiname}.site-meta.xml' )
+            fileCopier.copyFile( f'{srcFolder}/{folder}/{apiname}.site-meta.xml', f'{deltaFolder}/{folder}/{apiname}.site-meta.xml' )
     elif folder == 'objectTranslations':
         objectTranslationName = apiname.split('/')[0]
         objectTranslationFile = f'{objectTranslationName}/{objectTranslationName}.objectTranslation-meta.xml'
-        copyTree(f'{srcFolder}/{folder}/{objectTranslationName}',f'{deltaFolder}/{folder}/{objectTranslationName}')
-        copyFile( f'{srcFolder}/{folder}/{apiname}', f'{deltaFolder}/{folder}/{apiname}' )
+        fileCopier.copyTree(f'{srcFolder}/{folder}/{objectTranslationName}',f'{deltaFolder}/{folder}/{objectTranslationName}')
+        fileCopier.copyFile( f'{srcFolder}/{folder}/{apiname}', f'{deltaFolder}/{folder}/{apiname}' )
         if not os.path.isfile( f'{deltaFolder}/{folder}/{objectTranslationFile}'):
-            copyFile( f'{srcFolder}/{folder}/{objectTranslationFile}', f'{deltaFolder}/{folder}/{objectTranslationFile}' )
+            fileCopier.copyFile( f'{srcFolder}/{folder}/{objectTranslationFile}', f'{deltaFolder}/{folder}/{objectTranslationFile}' )
     else:
         if '/' in apiname:
             subFolders      = apiname.split( '/' )
             listSubFolders  = subFolders[ :-1 ]
             pathFolders     = '/'.join( listSubFolders )
-            makeDirs( f'{deltaFolder}/{folder}/{pathFolders}' )
+            fileCopier.makeDirs( f'{deltaFolder}/{folder}/{pathFolders}' )
         else:
-            makeDirs( f'{deltaFolder}/{folder}' )
+            fileCopier.makeDirs( f'{deltaFolder}/{folder}' )
 
         if hasMetaFile and not 'documentFolder-meta.xml' in apiname and not 'emailFolder-meta.xml' in apiname:
             if folder == 'documents':
                 if 'document-meta.xml' in apiname:
                     rootFilename    = apiname[ : -len( 'document-meta.xml' ) ]
-                    listFiles       = glob.glob( f'{srcFolder}/{folder}/{rootFilename}*' )
+                    listFiles       = fileCopier.glob( f'{srcFolder}/{folder}/{rootFilename}*' )
                     pathFile        = [ file for file in listFiles if 'document-meta.xml' not in file ][ 0 ].split( '/' )
                     relatedFile     = pathFile[ len( pathFile ) - 1 ]
                 else:
                     relatedFile = apiname.split( '.' )[ 0 ]
                     relatedFile = f'{relatedFile}.document-meta.xml'
-                copyFile( f'{srcFolder}/{folder}/{relatedFile}', f'{deltaFolder}/{folder}/{relatedFile}' )
+                fileCopier.copyFile( f'{srcFolder}/{folder}/{relatedFile}', f'{deltaFolder}/{folder}/{relatedFile}' )
             else:
                 if '-meta.xml' in apiname:
                     relatedFile = apiname[ : -len( '-meta.xml' ) ]
                 else:
                     relatedFile = f'{apiname}-meta.xml'
-                copyFile( f'{srcFolder}/{folder}/{apiname}', f'{deltaFolder}/{folder}/{apiname}' )
-                if os.path.isfile( f'{srcFolder}/{folder}/{relatedFile}' ):
-                    copyFile( f'{srcFolder}/{folder}/{relatedFile}', f'{deltaFolder}/{folder}/{relatedFile}' )
-
-        copyFile( f'{srcFolder}/{folder}/{apiname}', f'{deltaFolder}/{folder}/{apiname}' )
-
+                if fileCopier.isFile( f'{srcFolder}/{folder}/{relatedFile}' ):
+                    fileCopier.copyFile( f'{srcFolder}/{folder}/{relatedFile}', f'{deltaFolder}/{folder}/{relatedFile}' )
 
-def copyFile(origin, destination):
-    shutil.copy( origin, destination )
-
-
-def copyTree(origin, destination):
-    if not os.path.exists( destination ):
-        shutil.copytree( origin, destination )
+        fileCopier.copyFile( f'{srcFolder}/{folder}/{apiname}', f'{deltaFolder}/{folder}/{apiname}' )
 
 
 def makeDirs( dirPath ):
     os.makedirs( dirPath, exist_ok=True )
-
-
-def splitFolderApiname(sourceFolder, filename):
-
-    if sourceFolder:
-        filenameSplit = filename[ len( sourceFolder ) + 1: ].split( '/' )
-    else:
-        filenameSplit = filename.split( '/' )
-
-    folder    = filenameSplit[ 3 ]
-    apiname   = '/'.join( filenameSplit[ 4: ] )
-    srcFolder = '/'.join( filenameSplit[ :3 ] )
-
-    return folder, apiname, srcFolder
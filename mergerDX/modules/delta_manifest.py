@@ -0,0 +1,136 @@
+''' Manifest of the last delta built in a delta folder '''
+import os
+import glob
+import json
+import shutil
+import hashlib
+
+from modules.git.models import DiffReader
+from modules.git.utils import get_commit_sha, get_git_dir, is_ancestor
+from modules.utils import INFO_TAG
+from modules.utils.models import DiffAccumulator
+
+MANIFEST_VERSION    = 1
+MANIFEST_FOLDER     = 'merger-manifests'
+
+
+class DeltaManifest:
+    ''' Stores the commits a delta folder was built from and the differences contributed
+        by every metadata key, a key being the folder and the first path component
+        without extension ( classes/MyClass, aura/MyBundle, objects/Account ), so
+        everything copied or generated for a key lives under that path in the delta folder.
+
+        When the target is the same and the previous source is an ancestor of the new one,
+        only the keys touched by the commits in between are removed and handled again '''
+
+    def __init__(self, deltaFolder, options):
+        deltaPath           = os.path.abspath( deltaFolder ).encode( 'utf-8' )
+        self.deltaFolder    = deltaFolder
+        self.options        = options
+        self.manifestPath   = os.path.join( get_git_dir(), MANIFEST_FOLDER, f'{hashlib.sha1( deltaPath ).hexdigest()}.json' )
+        self.sourceSha      = None
+        self.targetSha      = None
+        self.fragments      = {}
+        self.affectedKeys   = None
+
+    def prepare(self, sourceRef, targetRef, pathClassifier, pathspecs):
+        ''' Loads the previous manifest, cleaning the delta folder when it can not be reused '''
+        self.sourceSha                  = get_commit_sha( sourceRef )
+        self.targetSha                  = get_commit_sha( targetRef )
+        self.options[ 'pathspecs' ]     = pathspecs
+        previousManifest                = self.load()
+
+        # The delta folder is modified from here on, an interrupted build must not be reused
+        if previousManifest:
+            os.remove( self.manifestPath )
+
+        if not self.isReusable( previousManifest ):
+            print( f'{INFO_TAG} Clean up target folder \'{self.deltaFolder}\'' )
+            shutil.rmtree( self.deltaFolder, ignore_errors=True, onerror=None )
+            os.makedirs( self.deltaFolder )
+            self.fragments      = {}
+            self.affectedKeys   = None
+            return
+
+        print( f'{INFO_TAG} Updating delta folder \'{self.deltaFolder}\' built from \'{previousManifest[ "source" ]}\'' )
+        self.fragments      = { key : DiffAccumulator.fromDict( fragment ) for key, fragment in previousManifest[ 'fragments' ].items() }
+        self.affectedKeys   = set()
+        for difference in DiffReader( previousManifest[ 'source' ], self.sourceSha, pathspecs, renames=False ):
+            key = getKey( pathClassifier.classify( difference.path ) )
+            if key:
+                self.affectedKeys.add( key )
+
+        print( f'{INFO_TAG} {len( self.affectedKeys )} keys changed since the previous build' )
+        for key in self.affectedKeys:
+            self.fragments.pop( key, None )
+            self.removeOutputs( key )
+
+    def getDiffs(self, classification):
+        ''' Returns the map the differences of the classified path must be added to,
+            None when the path does not need to be handled again '''
+        key = getKey( classification )
+        if not key or ( self.affectedKeys is not None and not key in self.affectedKeys ):
+            return None
+        if not key in self.fragments:
+            self.fragments[ key ] = DiffAccumulator()
+        return self.fragments[ key ]
+
+    def getMapDiffs(self):
+        ''' Merges the differences of every key '''
+        mapDiffs = DiffAccumulator()
+        for fragment in self.fragments.values():
+            mapDiffs.update( fragment )
+        return mapDiffs
+
+    def load(self):
+        try:
+            with open( self.manifestPath, 'r', encoding='utf-8' ) as manifestFile:
+                return json.load( manifestFile )
+        except ( OSError, ValueError ):
+            return None
+
+    def save(self):
+        manifest = {
+            'version'   : MANIFEST_VERSION,
+            'source'    : self.sourceSha,
+            'target'    : self.targetSha,
+            'options'   : self.options,
+            'fragments' : { key : fragment.toDict() for key, fragment in self.fragments.items() if fragment.entries }
+        }
+        os.makedirs( os.path.dirname( self.manifestPath ), exist_ok=True )
+        with open( f'{self.manifestPath}.tmp', 'w', encoding='utf-8' ) as manifestFile:
+            json.dump( manifest, manifestFile )
+        os.replace( f'{self.manifestPath}.tmp', self.manifestPath )
+
+    def isReusable(self, previousManifest):
+        return ( previousManifest is not None
+                 and previousManifest.get( 'version' ) == MANIFEST_VERSION
+                 and previousManifest.get( 'options' ) == self.options
+                 and previousManifest.get( 'target' ) == self.targetSha
+                 and self.sourceSha is not None
+                 and os.path.isdir( self.deltaFolder )
+                 and is_ancestor( previousManifest[ 'source' ], self.sourceSha ) )
+
+    def removeOutputs(self, key):
+        ''' Removes everything placed in the delta folder for the key '''
+        keyPath = os.path.join( self.deltaFolder, key )
+        for outputPath in [ keyPath ] + glob.glob( f'{glob.escape( keyPath )}.*' ):
+            if os.path.isdir( outputPath ) and not os.path.islink( outputPath ):
+                shutil.rmtree( outputPath )
+            elif os.path.lexists( outputPath ):
+                os.remove( outputPath )
+
+        folderPath = os.path.dirname( keyPath )
+        if os.path.isdir( folderPath ) and not os.listdir( folderPath ):
+            os.rmdir( folderPath )
+
+
+def getKey(classification):
+    if not classification:
+        return None
+    _, folder, _, apiname = classification
+    rootName = apiname.split( '/' )[ 0 ]
+    if not rootName:
+        return None
+    # Dot files keep their whole name so the key never names the folder itself
+    return f'{folder}/{rootName.split( "." )[ 0 ] or rootName}'
@@ -1,7 +1,11 @@
 ''' Model module for git package '''
+import os
+import subprocess
+import tempfile
 from enum import Enum
 
-from modules.git.utils import get_short_sha, get_tag_commit
+from modules.git.utils import (get_file, get_object_id, get_short_sha,
+                               get_tag_commit)
 from modules.utils import (INFO_TAG, WARNING_TAG, call_subprocess,
                            truncate_string)
 from modules.utils.exceptions import InvalidCommitLine, NotAcceptedOutputType
@@ -140,6 +144,210 @@ class MergeCommit():
                 for merge_commit in output.splitlines()]
 
 
+class BlobReader:
+    ''' Reads file revisions through a single long-lived
+        `git cat-file --batch` process, falling back to `git show`
+        whenever the batch process can not serve the request '''
+
+    def __init__(self):
+        self.process = self.__start('--batch')
+        self.check_process = None
+        if not self.process:
+            print(f'{WARNING_TAG} Could not start git cat-file, '
+                  f'reading files with git show')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def get_file(self, filepath, revision):
+        ''' Returns the content of the file in the passed revision '''
+        try:
+            return b''.join(self.iter_file(filepath, revision))
+        except (OSError, ValueError):
+            self.__fail()
+            return get_file(filepath, revision)
+
+    def iter_file(self, filepath, revision, chunk_size=None):
+        ''' Yields the content of the file in the passed revision in chunks
+            of chunk_size bytes (whole content by default), the generator
+            must be exhausted or closed before the next request '''
+        size = self.__request_blob(f'{revision}:{filepath}')
+        if size is None:
+            yield get_file(filepath, revision)
+            return
+
+        remaining = size
+        try:
+            while remaining:
+                chunk = self.process.stdout.read(min(chunk_size or remaining,
+                                                     remaining))
+                if not chunk:
+                    raise ValueError('Truncated git cat-file output')
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            if self.process:
+                self.process.stdout.read(remaining + 1)
+
+    def get_object_id(self, filepath, revision):
+        ''' Returns the object id of the file in the passed revision, the
+            `git cat-file --batch-check` process is started on first use '''
+        object_name = f'{revision}:{filepath}'
+        if self.check_process is None and self.process:
+            self.check_process = self.__start('--batch-check')
+        if not self.check_process or '\n' in object_name:
+            return get_object_id(filepath, revision)
+        try:
+            self.check_process.stdin.write(f'{object_name}\n'.encode('utf-8'))
+            self.check_process.stdin.flush()
+
+            header = self.check_process.stdout.readline()
+            if not header:
+                raise ValueError('Unexpected end of git cat-file output')
+            if header.endswith((b' missing\n', b' ambiguous\n')):
+                return None
+            return header.split(b' ', 1)[0].decode('ascii')
+        except (OSError, ValueError):
+            self.__stop(self.check_process)
+            self.check_process = False
+            return get_object_id(filepath, revision)
+
+    def close(self):
+        ''' Stops the batch processes '''
+        for process in (self.process, self.check_process):
+            if process:
+                try:
+                    process.stdin.close()
+                    process.wait()
+                except OSError:
+                    process.kill()
+        self.process = None
+        self.check_process = None
+
+    def __request_blob(self, object_name):
+        ''' Requests an object to the batch process and reads its header,
+            returns the size of the blob or None if it can not be served '''
+        if not self.process or '\n' in object_name:
+            return None
+        try:
+            self.process.stdin.write(f'{object_name}\n'.encode('utf-8'))
+            self.process.stdin.flush()
+
+            header = self.process.stdout.readline()
+            if not header:
+                raise ValueError('Unexpected end of git cat-file output')
+            if header.endswith((b' missing\n', b' ambiguous\n')):
+                return None
+
+            _, object_type, size = header.rsplit(b' ', 2)
+            if object_type != b'blob':
+                self.process.stdout.read(int(size) + 1)
+                return None
+            return int(size)
+        except (OSError, ValueError):
+            self.__fail()
+            return None
+
+    @staticmethod
+    def __start(mode):
+        ''' Starts a git cat-file process in the passed batch mode '''
+        try:
+            return subprocess.Popen(['git', 'cat-file', mode],
+                                    stdin=subprocess.PIPE,
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL)
+        except OSError:
+            return None
+
+    @staticmethod
+    def __stop(process):
+        ''' Kills a git cat-file process '''
+        if process:
+            process.kill()
+            process.wait()
+
+    def __fail(self):
+        ''' Stops using the batch process after an unexpected error '''
+        print(f'{WARNING_TAG} git cat-file stopped responding, '
+              f'reading files with git show')
+        self.__stop(self.process)
+        self.process = None
+
+
+class DiffEntry:
+    ''' Entry of a git diff, previous_path and score are only set for
+        renames and copies '''
+
+    def __init__(self, status, path, previous_path=None, score=None):
+        self.status = status
+        self.path = path
+        self.previous_path = previous_path
+        self.score = score
+
+    def __str__(self):
+        if self.previous_path is None:
+            return f'{self.status}\t{self.path}'
+        return f'{self.status}{self.score:03d}\t{self.previous_path}\t{self.path}'
+
+    def __repr__(self):
+        return f'<DiffEntry {self}>'
+
+
+class DiffReader:
+    ''' Streams the entries of `git diff --name-status -z` while git is
+        still writing them, the exit status and error output of git are
+        available once the entries are exhausted '''
+
+    def __init__(self, target, source, pathspecs=None, renames=True,
+                 chunk_size=64 * 1024):
+        self.target = target
+        self.source = source
+        self.pathspecs = pathspecs or []
+        self.renames = renames
+        self.chunk_size = chunk_size
+        self.returncode = None
+        self.error = ''
+
+    def __iter__(self):
+        command = ['git', 'diff', '--name-status', '-z',
+                   *([] if self.renames else ['--no-renames']),
+                   self.target, self.source, '--', *self.pathspecs]
+        with tempfile.TemporaryFile() as error_file:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                                       stderr=error_file)
+            try:
+                fields = self.__iter_fields(process.stdout)
+                for status in fields:
+                    path = os.fsdecode(next(fields, b''))
+                    if status[:1] in (b'R', b'C'):
+                        yield DiffEntry(status[:1].decode(),
+                                        os.fsdecode(next(fields, b'')), path,
+                                        int(status[1:] or 0))
+                    else:
+                        yield DiffEntry(status[:1].decode(), path)
+            except GeneratorExit:
+                process.kill()
+                raise
+            finally:
+                process.stdout.close()
+                self.returncode = process.wait()
+                error_file.seek(0)
+                self.error = error_file.read().decode('utf-8', 'replace')
+
+    def __iter_fields(self, stream):
+        ''' Yields the NUL separated fields of the stream '''
+        pending = b''
+        for chunk in iter(lambda: stream.read1(self.chunk_size), b''):
+            fields = (pending + chunk).split(b'\0')
+            pending = fields.pop()
+            yield from fields
+        if pending:
+            yield pending
+
+
 class Version(Enum):
     ''' Types of versions '''
     FIX = 'fix'
@@ -68,6 +68,50 @@ def get_file(filepath, revision):
     return output.encode( 'utf-8' )
 
 
+def get_object_id(filepath, revision):
+    ''' Returns the object id of the file in the passed revision, None if
+        it does not exist '''
+    command = f'git rev-parse --verify --quiet {revision}:"{filepath}"'
+    object_id, returncode = call_subprocess(command, False)
+    return object_id.strip() if returncode == 0 else None
+
+
+def list_tree(revision):
+    ''' Returns the (mode, object id, path) of every file in the revision,
+        paths are relative to the current directory as in git ls-tree '''
+    output, returncode = call_subprocess(f'git ls-tree -r -z {revision}', False)
+    if returncode:
+        return []
+    entries = []
+    for line in output.split('\0'):
+        if line:
+            info, path = line.split('\t', 1)
+            mode, _, object_id = info.split(' ')
+            entries.append((mode, object_id, path))
+    return entries
+
+
+def get_commit_sha(revision):
+    ''' Returns the sha of the commit the revision points to, None if it
+        does not exist '''
+    command = f'git rev-parse --verify --quiet {revision}^{{commit}}'
+    commit_sha, returncode = call_subprocess(command, False)
+    return commit_sha.strip() if returncode == 0 else None
+
+
+def is_ancestor(ancestor, descendant):
+    ''' Checks if the ancestor commit is reachable from the descendant '''
+    command = f'git merge-base --is-ancestor {ancestor} {descendant}'
+    _, returncode = call_subprocess(command, False)
+    return returncode == 0
+
+
+def get_git_dir():
+    ''' Returns the absolute path of the git directory of the repository '''
+    git_dir, _ = call_subprocess('git rev-parse --absolute-git-dir', False)
+    return git_dir.strip()
+
+
 def is_git_repository():
     validate_repo = 'git rev-parse --is-inside-work-tree'
     _, returncode = call_subprocess(validate_repo, False)
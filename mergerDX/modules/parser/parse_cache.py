@@ -0,0 +1,93 @@
+''' Persistent cache of parsed metadata files '''
+import os
+import pickle
+import tempfile
+
+from modules.git.utils import get_git_dir
+from modules.utils import INFO_TAG
+
+CACHE_VERSION	= 1
+CACHE_FOLDER	= 'merger-cache'
+MEGABYTE		= 1024 * 1024
+
+
+class ParseCache:
+	''' On disk cache of parsed files keyed by git blob object id, the least
+		recently used entries are evicted once the cache grows over maxSize bytes '''
+
+	def __init__(self, cacheDir=None, maxSize=64 * MEGABYTE):
+		self.cacheDir	= cacheDir or os.path.join( get_git_dir(), CACHE_FOLDER )
+		self.maxSize	= maxSize
+
+	def get(self, objectId):
+		''' Returns the cached value of the blob, None if it is not cached '''
+		entryPath = self.getEntryPath( objectId )
+		try:
+			with open( entryPath, 'rb' ) as entryFile:
+				value = pickle.load( entryFile )
+		except FileNotFoundError:
+			return None
+		except Exception:
+			# Unreadable entries are dropped and parsed again
+			removeFile( entryPath )
+			return None
+
+		try:
+			os.utime( entryPath )
+		except OSError:
+			pass
+		return value
+
+	def put(self, objectId, value):
+		''' Stores the value of the blob, the entry is written to a temporary
+			file first so concurrent runs never read a partial entry '''
+		entryPath	= self.getEntryPath( objectId )
+		entryFolder	= os.path.dirname( entryPath )
+		try:
+			os.makedirs( entryFolder, exist_ok=True )
+			fileDescriptor, tempPath = tempfile.mkstemp( dir=entryFolder, suffix='.tmp' )
+		except OSError:
+			return
+
+		try:
+			with os.fdopen( fileDescriptor, 'wb' ) as entryFile:
+				pickle.dump( value, entryFile, protocol=pickle.HIGHEST_PROTOCOL )
+			os.replace( tempPath, entryPath )
+		except OSError:
+			removeFile( tempPath )
+
+	def evict(self):
+		''' Removes the least recently used entries until the cache fits in maxSize '''
+		entries		= []
+		totalSize	= 0
+		for folder, _, filenames in os.walk( self.cacheDir ):
+			for filename in filenames:
+				entryPath = os.path.join( folder, filename )
+				try:
+					entryStat = os.stat( entryPath )
+				except OSError:
+					continue
+				entries.append( ( entryStat.st_mtime, entryStat.st_size, entryPath ) )
+				totalSize += entryStat.st_size
+
+		if totalSize <= self.maxSize:
+			return
+
+		removedEntries = 0
+		for _, entrySize, entryPath in sorted( entries ):
+			if totalSize <= self.maxSize:
+				break
+			removeFile( entryPath )
+			totalSize		-= entrySize
+			removedEntries	+= 1
+		print( f'{INFO_TAG} Evicted {removedEntries} entries from parse cache \'{self.cacheDir}\'' )
+
+	def getEntryPath(self, objectId):
+		return os.path.join( self.cacheDir, objectId[ :2 ], f'{objectId[ 2: ]}.v{CACHE_VERSION}' )
+
+
+def removeFile(filePath):
+	try:
+		os.remove( filePath )
+	except OSError:
+		pass
@@ -1,46 +1,117 @@
+import json
+import hashlib
 import xml.etree.ElementTree as elTree
 
-from modules.git.utils import get_file
+from modules.git.utils import get_file, get_object_id
 from modules.utils import XMLNS
 from modules.utils.utilities import getFullName
 from modules.utils.exceptions import DuplicatedTags
 
-def parseFile(filename, reference):
+CHUNK_SIZE = 64 * 1024
 
-	fileString	= get_file( filename, reference )
-	xmlData		= elTree.fromstring( fileString )
+def iterParseFile(filename, reference, blobReader=None):
+	''' Incremental parser of a file revision, returns the root tag and a generator of
+		( tagName, fullName, digest, elementBytes ) records, one per child of the root.
+		Children are released once emitted, fullName is None for text only children '''
+
+	if blobReader:
+		chunks	= blobReader.iter_file( filename, reference, CHUNK_SIZE )
+	else:
+		chunks	= iter( [ get_file( filename, reference ) ] )
+
+	events		= iterParserEvents( chunks )
+	_, xmlData	= next( events )
 	rootTag		= xmlData.tag.split( XMLNS )[ 1 ]
 
-	setDuplicatedFullNames = set()
-	mapComponents = {}
+	return rootTag, iterRecords( filename, xmlData, events )
 
-	for childElement in xmlData.getchildren():
-		tagName = childElement.tag.split( XMLNS )[ 1 ]
-		if childElement:
-			addValueToMap( tagName, childElement, mapComponents, setDuplicatedFullNames )
+
+def parseFileDigests(filename, reference, blobReader=None, parseCache=None):
+	''' Returns the root tag and a map with the digest of every child, text only
+		children keep their text. When a parseCache is given the
+		result is looked up and stored by the object id of the blob '''
+
+	objectId = None
+	if parseCache:
+		objectId = blobReader.get_object_id( filename, reference ) if blobReader else get_object_id( filename, reference )
+		cachedResult = parseCache.get( objectId ) if objectId else None
+		if cachedResult:
+			return cachedResult
+
+	rootTag, records	= iterParseFile( filename, reference, blobReader )
+	mapDigests			= {}
+
+	for tagName, fullName, digest, elementBytes in records:
+		if fullName is None:
+			mapDigests[ tagName ] = getRecordText( elementBytes )
+		else:
+			if not tagName in mapDigests:
+				mapDigests[ tagName ] = {}
+			mapDigests[ tagName ][ fullName ] = digest
+
+	if objectId:
+		parseCache.put( objectId, ( rootTag, mapDigests ) )
+	return rootTag, mapDigests
+
+
+def getRecordData(elementBytes):
+	''' Materializes the data of a record as getChildData does '''
+	return getChildData( elTree.fromstring( elementBytes ) )
+
+
+def getRecordText(elementBytes):
+	return elTree.fromstring( elementBytes ).text
+
+
+def iterParserEvents(chunks):
+	parser = elTree.XMLPullParser( events=( 'start', 'end' ) )
+	for chunk in chunks:
+		parser.feed( chunk )
+		yield from parser.read_events()
+	parser.close()
+	yield from parser.read_events()
+
+
+def iterRecords(filename, xmlData, events):
+	setFullNames			= set()
+	setDuplicatedFullNames	= set()
+	depth					= 1
+
+	for event, childElement in events:
+		if event == 'start':
+			depth += 1
+			continue
+		depth -= 1
+		if depth != 1:
+			continue
+
+		tagName				= childElement.tag.split( XMLNS )[ 1 ]
+		childElement.tail	= None
+		if len( childElement ):
+			fullName = getFullName( tagName, childElement )
+			if ( tagName, fullName ) in setFullNames:
+				setDuplicatedFullNames.add( f'{tagName}-{fullName}' )
+			setFullNames.add( ( tagName, fullName ) )
+			yield tagName, fullName, getDigest( getChildData( childElement ) ), elTree.tostring( childElement )
 		else:
-			mapComponents[ tagName ] = childElement.text
+			yield tagName, None, getDigest( childElement.text ), elTree.tostring( childElement )
+		del xmlData[ : ]
 
 	if len( setDuplicatedFullNames ) > 0:
 		print( f'##[error] Duplicated Tags found in file {filename}' )
 		print( setDuplicatedFullNames )
 		raise DuplicatedTags( filename )
-	return rootTag, mapComponents
 
 
-def addValueToMap(tagName, childElement, mapComponents, setDuplicatedFullNames, fullName=None):
-	if not fullName:
-		fullName = getFullName( tagName, childElement )
-	if not tagName in mapComponents:
-		mapComponents[ tagName ] = {}
-	if fullName in mapComponents[ tagName ]:
-		setDuplicatedFullNames.add( f'{tagName}-{fullName}' )
-	mapComponents[ tagName ][ fullName ] = getChildData( childElement )
+def getDigest(childData):
+	''' Canonical digest of the data returned by getChildData, equal digests mean equal data '''
+	canonicalData = json.dumps( childData, sort_keys=True, ensure_ascii=False )
+	return hashlib.sha1( canonicalData.encode( 'utf-8' ) ).digest()
 
 
 def getChildData(xmlElement):
 	mapData = {}
-	for childElement in xmlElement.getchildren():
+	for childElement in xmlElement:
 		tagName = childElement.tag.split( XMLNS )[ 1 ]
 		if childElement:
 			if not tagName in mapData:
@@ -59,7 +130,7 @@ def getChildData(xmlElement):
 def mergeFileToCommit(filePath, mapComponents, mapAttributes):
 	xmlData = elTree.parse( filePath ).getroot()
 	fileTag = xmlData.tag.split( XMLNS )[ 1 ]
-	for childElement in xmlData.getchildren():
+	for childElement in xmlData:
 		tagName = childElement.tag.split( XMLNS )[ 1 ]
 		if childElement:
 			checkElement( tagName, childElement, mapComponents )
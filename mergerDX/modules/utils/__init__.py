@@ -1,13 +1,13 @@
 ''' Utils module '''
 import os
 import re
-import json
 import shutil
 import subprocess
 
 from lxml import etree
 
 import __main__
+from modules.utils.describe_index import readDescribeIndex
 from modules.utils.exceptions import NotCreatedDescribeLog
 from modules.utils.models import MetadataType
 
@@ -114,19 +114,10 @@ def getXmlNamesFromJSON(filepath):
     if not os.path.isfile( filepath ):
         raise NotCreatedDescribeLog( filepath )
 
-    with open( filepath, 'r' ) as file:
-        data = json.load( file )
-
     dictionary = {}
 
-    for metadataInfo in data[ 'metadataObjects' ]:
-        inFolder        = metadataInfo[ 'inFolder' ]
-        hasMetadata     = metadataInfo[ 'metaFile' ]
-        childObjects    = metadataInfo[ 'childXmlNames' ] if 'childXmlNames' in metadataInfo else []
-        suffix          = metadataInfo[ 'suffix' ] if 'suffix' in metadataInfo else ''
-        xmlName         = metadataInfo[ 'xmlName' ]
-        dirName         = metadataInfo[ 'directoryName' ]
-        dictKey         = dirName
+    for ( xmlName, dirName, suffix, hasMetadata, inFolder, childObjects ) in readDescribeIndex( filepath ):
+        dictKey = dirName
 
         if 'territory2Models' == dirName and 'territory2Model' != suffix:
             dictKey = suffix
@@ -3,6 +3,7 @@
 import sys
 import argparse
 from modules.utils import DELTA_FOLDER
+from modules.utils.copier import LINK_MODES
 
 def parseArgs():
     ''' Parse args '''
@@ -43,6 +44,14 @@ def mergeParser(subparser):
     subparser.add_argument( '-nr', '--no-reset', default=True, action='store_false', dest='reset', help='Flag to select if it is necessary to hard reset the branches before merge' )
     subparser.add_argument( '-sf', '--source-folder', help=f'Source folder name' )
     subparser.add_argument( '-dsc', '--describe', default='describe.log', help='Path to describe log file' )
+    subparser.add_argument( '-j', '--jobs', default=1, type=int, help='Number of workers used to compare parseable metadata files, default=1' )
+    subparser.add_argument( '-c', '--cache', default=False, action='store_true', help='Flag to cache the parsed target side of metadata files between runs' )
+    subparser.add_argument( '-cd', '--cache-dir', help='Folder of the cache of parsed metadata files, default=<git dir>/merger-cache' )
+    subparser.add_argument( '-cs', '--cache-size', default=64, type=int, help='Maximum size in MB of the cache of parsed metadata files, default=64' )
+    subparser.add_argument( '-inc', '--include', nargs='+', help='Glob patterns, relative to the repository root, of the paths to diff instead of the package directories' )
+    subparser.add_argument( '-exc', '--exclude', nargs='+', help='Glob patterns, relative to the repository root, of the paths left out of the diff' )
+    subparser.add_argument( '-dd', '--dedup', default=False, action='store_true', help='Flag to write each distinct file once and hard link its copies in the delta folder' )
+    subparser.add_argument( '-lm', '--link-mode', default='copy', choices=LINK_MODES, help='How files are placed in the delta folder, linking falls back to copy per file, default=copy' )
 
 
 def buildParser(subparser):
@@ -58,3 +67,13 @@ def buildParser(subparser):
     subparser.add_argument( '-nr', '--no-reset', default=True, action='store_false', dest='reset', help='Flag to select if it is necessary to hard reset the branches before merge' )
     subparser.add_argument( '-sf', '--source-folder', help=f'Source folder name' )
     subparser.add_argument( '-dsc', '--describe', default='describe.log', help='Path to describe log file' )
+    subparser.add_argument( '-j', '--jobs', default=1, type=int, help='Number of workers used to compare parseable metadata files, default=1' )
+    subparser.add_argument( '-c', '--cache', default=False, action='store_true', help='Flag to cache the parsed target side of metadata files between runs' )
+    subparser.add_argument( '-cd', '--cache-dir', help='Folder of the cache of parsed metadata files, default=<git dir>/merger-cache' )
+    subparser.add_argument( '-cs', '--cache-size', default=64, type=int, help='Maximum size in MB of the cache of parsed metadata files, default=64' )
+    subparser.add_argument( '-inr', '--incremental', default=False, action='store_true', help='Flag to update the delta folder of the previous build when only the source ref moved forward' )
+    subparser.add_argument( '-nco', '--no-checkout', default=True, action='store_false', dest='checkout', help='Flag to read the files from the source ref objects instead of checking it out' )
+    subparser.add_argument( '-inc', '--include', nargs='+', help='Glob patterns, relative to the repository root, of the paths to diff instead of the package directories' )
+    subparser.add_argument( '-exc', '--exclude', nargs='+', help='Glob patterns, relative to the repository root, of the paths left out of the diff' )
+    subparser.add_argument( '-dd', '--dedup', default=False, action='store_true', help='Flag to write each distinct file once and hard link its copies in the delta folder' )
+    subparser.add_argument( '-lm', '--link-mode', default='copy', choices=LINK_MODES, help='How files are placed in the delta folder, linking falls back to copy per file, default=copy' )
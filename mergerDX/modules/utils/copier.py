@@ -0,0 +1,264 @@
+''' File copier used to materialize the delta folder '''
+import os
+import glob
+import bisect
+import shutil
+import fnmatch
+import hashlib
+import tempfile
+
+from modules.git.models import BlobReader
+from modules.git.utils import list_tree
+from modules.utils import INFO_TAG, WARNING_TAG
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LINK_MODES  = [ 'copy', 'hardlink', 'reflink', 'symlink' ]
+FICLONE     = 0x40049409
+CHUNK_SIZE  = 1024 * 1024
+
+MODE_EXECUTABLE = '100755'
+MODE_SYMLINK    = '120000'
+MODE_SUBMODULE  = '160000'
+
+
+class FileCopier:
+    ''' Copies files and directory trees into the delta folder, with a link mode other
+        than copy the files are linked instead and copied only when linking fails '''
+
+    def __init__(self, linkMode='copy', objectStore=None):
+        self.linkMode       = linkMode
+        self.linkFailed     = False
+        self.objectStore    = objectStore
+        self.linkFunction   = {
+            'hardlink'  : os.link,
+            'reflink'   : reflinkFile,
+            'symlink'   : symlinkFile
+        }.get( linkMode )
+
+    def copyFile(self, origin, destination):
+        if not self.linkFunction:
+            self.writeFile( origin, destination )
+            return
+        self.linkFile( origin, destination )
+
+    def copyTree(self, origin, destination):
+        if os.path.exists( destination ):
+            return
+        if not self.linkFunction:
+            shutil.copytree( origin, destination, copy_function=self.writeFile if self.objectStore else shutil.copy2 )
+        else:
+            shutil.copytree( origin, destination, copy_function=self.linkFile )
+
+    def makeDirs(self, dirPath):
+        os.makedirs( dirPath, exist_ok=True )
+
+    def isFile(self, path):
+        return os.path.isfile( path )
+
+    def glob(self, pattern):
+        return glob.glob( pattern )
+
+    def close(self):
+        if self.objectStore:
+            self.objectStore.close()
+
+    def writeFile(self, origin, destination):
+        ''' Copies the bytes of the file, through the object store when there is one '''
+        if not self.objectStore:
+            return shutil.copy( origin, destination )
+
+        if os.path.isdir( destination ):
+            destination = os.path.join( destination, os.path.basename( origin ) )
+        fileMode = os.stat( origin ).st_mode & 0o777
+        self.objectStore.place( f'{hashFile( origin )}-{fileMode:o}', destination, lambda storePath: copyWithMode( origin, storePath, fileMode ) )
+        return destination
+
+    def linkFile(self, origin, destination):
+        # The destination is replaced, never written through, so the linked origin is left untouched
+        if os.path.lexists( destination ):
+            os.remove( destination )
+        try:
+            self.linkFunction( origin, destination )
+        except OSError as exception:
+            if not self.linkFailed:
+                print( f'{WARNING_TAG} Could not {self.linkMode} \'{origin}\' ({exception.strerror}), copying instead' )
+                self.linkFailed = True
+            self.writeFile( origin, destination )
+        return destination
+
+
+class GitObjectCopier(FileCopier):
+    ''' Copies files from the git objects of a revision instead of the working tree,
+        so the revision does not need to be checked out. The tree of the revision is
+        listed once and the blobs are streamed through a BlobReader '''
+
+    def __init__(self, revision, objectStore=None):
+        super().__init__( objectStore=objectStore )
+        self.revision   = revision
+        self.blobReader = None
+        self.entries    = None
+        self.paths      = None
+
+    def copyFile(self, origin, destination):
+        entry = self.getEntry( origin )
+        if not entry:
+            raise FileNotFoundError( f'\'{origin}\' not found in \'{self.revision}\'' )
+        self.writeBlob( entry, origin, destination )
+
+    def copyTree(self, origin, destination):
+        if os.path.exists( destination ):
+            return
+        prefix  = f'{os.path.normpath( origin )}/'
+        index   = bisect.bisect_left( self.getPaths(), prefix )
+        if index == len( self.paths ) or not self.paths[ index ].startswith( prefix ):
+            raise FileNotFoundError( f'\'{origin}\' not found in \'{self.revision}\'' )
+
+        for path in self.paths[ index: ]:
+            if not path.startswith( prefix ):
+                break
+            filePath = os.path.join( destination, path[ len( prefix ): ] )
+            os.makedirs( os.path.dirname( filePath ), exist_ok=True )
+            self.writeBlob( self.entries[ path ], path, filePath )
+
+    def isFile(self, path):
+        return self.getEntry( path ) is not None
+
+    def glob(self, pattern):
+        folder      = os.path.dirname( os.path.normpath( pattern ) )
+        prefix      = f'{folder}/' if folder else ''
+        paths       = self.getPaths()
+        index       = bisect.bisect_left( paths, prefix )
+        matches     = []
+        for path in paths[ index: ]:
+            if not path.startswith( prefix ):
+                break
+            if not '/' in path[ len( prefix ): ] and fnmatch.fnmatchcase( path, os.path.normpath( pattern ) ):
+                matches.append( path )
+        return matches
+
+    def close(self):
+        if self.blobReader:
+            self.blobReader.close()
+            self.blobReader = None
+        super().close()
+
+    def getEntry(self, path):
+        self.getPaths()
+        return self.entries.get( os.path.normpath( path ) )
+
+    def getPaths(self):
+        if self.paths is None:
+            self.entries    = { path : ( mode, objectId ) for mode, objectId, path in list_tree( self.revision ) }
+            self.paths      = sorted( self.entries )
+        return self.paths
+
+    def writeBlob(self, entry, path, destination):
+        mode, objectId = entry
+        if mode == MODE_SUBMODULE:
+            return
+        if not self.blobReader:
+            self.blobReader = BlobReader()
+        if os.path.lexists( destination ):
+            os.remove( destination )
+
+        if mode == MODE_SYMLINK:
+            os.symlink( self.blobReader.get_file( f'./{path}', self.revision ), destination )
+        elif self.objectStore:
+            self.objectStore.place( f'{objectId}-{mode}', destination, lambda storePath: self.writeBlobContent( mode, path, storePath ) )
+        else:
+            self.writeBlobContent( mode, path, destination )
+
+    def writeBlobContent(self, mode, path, destination):
+        with open( destination, 'wb' ) as destinationFile:
+            for chunk in self.blobReader.iter_file( f'./{path}', self.revision, CHUNK_SIZE ):
+                destinationFile.write( chunk )
+        if mode == MODE_EXECUTABLE:
+            os.chmod( destination, 0o755 )
+
+
+class ObjectStore:
+    ''' Content addressed staging area for the delta folder, every object is written
+        once and hard linked into each place it is needed. The store lives next to the
+        delta folder, so the links stay on the same filesystem, and is removed on close '''
+
+    def __init__(self, deltaFolder):
+        self.deltaFolder        = deltaFolder
+        self.storeFolder        = None
+        self.objectSizes        = {}
+        self.mapDestinations    = {}
+        self.bytesWritten       = 0
+
+    def place(self, objectKey, destination, writeObject):
+        ''' Links the object into the destination, writeObject( path ) is only called
+            the first time the object is needed '''
+        if not self.storeFolder:
+            parentFolder        = os.path.dirname( os.path.abspath( self.deltaFolder ) )
+            self.storeFolder    = tempfile.mkdtemp( prefix='.merger-objects-', dir=parentFolder )
+
+        storePath = os.path.join( self.storeFolder, objectKey )
+        if not objectKey in self.objectSizes:
+            writeObject( storePath )
+            self.objectSizes[ objectKey ]   = os.path.getsize( storePath )
+            self.bytesWritten               += self.objectSizes[ objectKey ]
+        # A destination placed again keeps only its last object
+        self.mapDestinations[ os.path.normpath( destination ) ] = objectKey
+
+        if os.path.lexists( destination ):
+            os.remove( destination )
+        try:
+            os.link( storePath, destination )
+        except OSError:
+            shutil.copy( storePath, destination )
+
+    def close(self):
+        if not self.storeFolder:
+            return
+        shutil.rmtree( self.storeFolder, ignore_errors=True )
+        self.storeFolder = None
+        bytesReferenced  = sum( self.objectSizes[ objectKey ] for objectKey in self.mapDestinations.values() )
+        print( f'{INFO_TAG} Delta files: {formatSize( bytesReferenced )} referenced, '
+               f'{formatSize( self.bytesWritten )} written ({len( self.objectSizes )} unique files)' )
+
+
+def reflinkFile(origin, destination):
+    ''' Clones the file sharing its extents, only supported by some Linux filesystems '''
+    if not fcntl:
+        raise OSError( 0, 'reflinks are not supported on this platform' )
+
+    with open( origin, 'rb' ) as originFile, open( destination, 'wb' ) as destinationFile:
+        try:
+            fcntl.ioctl( destinationFile.fileno(), FICLONE, originFile.fileno() )
+        except OSError:
+            destinationFile.close()
+            os.remove( destination )
+            raise
+    shutil.copymode( origin, destination )
+
+
+def symlinkFile(origin, destination):
+    os.symlink( os.path.abspath( origin ), destination )
+
+
+def hashFile(filePath):
+    fileHash = hashlib.sha1()
+    with open( filePath, 'rb' ) as originFile:
+        for chunk in iter( lambda: originFile.read( CHUNK_SIZE ), b'' ):
+            fileHash.update( chunk )
+    return fileHash.hexdigest()
+
+
+def copyWithMode(origin, destination, fileMode):
+    shutil.copyfile( origin, destination )
+    os.chmod( destination, fileMode )
+
+
+def formatSize(size):
+    for unit in [ 'B', 'KB', 'MB' ]:
+        if size < 1024:
+            return f'{size:.1f} {unit}' if unit != 'B' else f'{size} {unit}'
+        size /= 1024
+    return f'{size:.1f} GB'
@@ -0,0 +1,82 @@
+''' Compiled index of the describe log
+
+    The metadata types of the describe are stored as a marshalled table in the user
+    cache folder, named after the hash of the describe they were compiled from, so
+    the json is only parsed again when the describe changes and nothing is written
+    into the repository. mergeMetadata keeps a copy of this module, each tool runs from
+    its own folder with its own modules package, both share the same index files.
+'''
+import os
+import json
+import marshal
+import hashlib
+
+INDEX_VERSION   = 1
+INDEX_FOLDER    = os.path.join( 'alm-sf-dx', 'describe' )
+
+
+def readDescribeIndex(describePath):
+    ''' Returns the metadata types of the describe as a tuple of
+        ( xmlName, dirName, suffix, hasMetadata, inFolder, childXmlNames ) records '''
+
+    with open( describePath, 'rb' ) as describeFile:
+        describeBytes = describeFile.read()
+
+    describeHash    = hashlib.sha1( describeBytes ).hexdigest()
+    indexPath       = os.path.join( getIndexFolder(), f'{describeHash}.idx' )
+    metadataTypes   = loadIndex( indexPath, describeHash )
+    if metadataTypes is None:
+        metadataTypes = compileDescribe( describeBytes )
+        saveIndex( indexPath, describeHash, metadataTypes )
+    return metadataTypes
+
+
+def getIndexFolder():
+    ''' $XDG_CACHE_HOME/alm-sf-dx/describe, ~/.cache when it is not set '''
+    cacheFolder = os.environ.get( 'XDG_CACHE_HOME' ) or os.path.join( os.path.expanduser( '~' ), '.cache' )
+    return os.path.join( cacheFolder, INDEX_FOLDER )
+
+
+def compileDescribe(describeBytes):
+    data            = json.loads( describeBytes )
+    metadataTypes   = []
+    for metadataInfo in data[ 'metadataObjects' ]:
+        metadataTypes.append( (
+            metadataInfo[ 'xmlName' ],
+            metadataInfo[ 'directoryName' ],
+            metadataInfo.get( 'suffix', '' ),
+            metadataInfo[ 'metaFile' ],
+            metadataInfo[ 'inFolder' ],
+            tuple( metadataInfo.get( 'childXmlNames', () ) )
+        ) )
+    return tuple( metadataTypes )
+
+
+def loadIndex(indexPath, describeHash):
+    ''' Returns the metadata types of the index, None if it is missing, unreadable
+        or compiled from another describe '''
+    try:
+        with open( indexPath, 'rb' ) as indexFile:
+            indexVersion, indexHash, metadataTypes = marshal.loads( indexFile.read() )
+    except ( OSError, EOFError, ValueError, TypeError ):
+        return None
+
+    if indexVersion != INDEX_VERSION or indexHash != describeHash:
+        return None
+    return metadataTypes
+
+
+def saveIndex(indexPath, describeHash, metadataTypes):
+    ''' Writes the index through a temporary file, without a writable cache
+        folder the describe is simply parsed on every run '''
+    tempPath = f'{indexPath}.{os.getpid()}.tmp'
+    try:
+        os.makedirs( os.path.dirname( indexPath ), exist_ok=True )
+        with open( tempPath, 'wb' ) as indexFile:
+            indexFile.write( marshal.dumps( ( INDEX_VERSION, describeHash, metadataTypes ) ) )
+        os.replace( tempPath, indexPath )
+    except OSError:
+        try:
+            os.remove( tempPath )
+        except OSError:
+            pass
@@ -6,6 +6,17 @@ class MergerException(Exception):
     ''' Base Exception For Merger App '''
     ERROR_CODE = 127
 
+    def __reduce__(self):
+        ''' Keeps the formatted message when raised inside a worker process '''
+        return (restore_exception, (self.__class__, str(self)))
+
+
+def restore_exception(exception_class, message):
+    ''' Rebuilds a pickled exception without calling its __init__ '''
+    exception = Exception.__new__(exception_class)
+    Exception.__init__(exception, message)
+    return exception
+
 
 class MergerExceptionWarning(MergerException):
     ''' Base Exception For Merger App '''
@@ -1,5 +1,6 @@
 ''' General models module '''
 import enum
+from sys import intern
 
 
 class OutputType(enum.Enum):
@@ -17,6 +18,8 @@ class OutputType(enum.Enum):
 class MetadataType:
     ''' Metadata Type Implementation for wrapping the describe log info '''
 
+    __slots__ = ( 'xmlName', 'dirName', 'suffix', 'hasMetadata', 'inFolder', 'childObjects' )
+
     def __init__(self, xmlName, dirName, suffix, hasMetadata, inFolder, childObjects):
         self.xmlName        = xmlName
         self.dirName        = dirName
@@ -29,6 +32,120 @@ class MetadataType:
         return f'<{self.xmlName}>'
 
 
+class PathClassifier:
+    ''' Classifies changed paths into ( srcFolder, folder, xmlDefinition, apiname )
+        splitting them once, package directories are indexed in a prefix tree
+        of path components so the lookup does not depend on the number of packages '''
+
+    PACKAGE_END = None
+
+    def __init__(self, projectNames, xmlNames, sourceFolder=None):
+        self.xmlNames       = xmlNames
+        self.sourceFolder   = sourceFolder
+        self.packageTree    = {}
+        for projectName in projectNames:
+            node = self.packageTree
+            for component in projectName.split( '/' ):
+                if component and component != '.':
+                    node = node.setdefault( component, {} )
+            node[ self.PACKAGE_END ] = True
+
+    def classify(self, filename):
+        ''' Returns the classification of the path, None if it is not inside a package
+            directory, xmlDefinition is None when the folder is not in the describe '''
+        pathComponents = filename.split( '/' )
+        if self.sourceFolder:
+            relativeComponents = filename[ len( self.sourceFolder ) + 1: ].split( '/' )
+            if not self.isPackagePath( relativeComponents ) and not self.isPackagePath( pathComponents ):
+                return None
+            pathComponents = relativeComponents
+        elif not self.isPackagePath( pathComponents ):
+            return None
+
+        if len( pathComponents ) < 4:
+            return None
+        folder = pathComponents[ 3 ]
+        return '/'.join( pathComponents[ :3 ] ), folder, self.xmlNames.get( folder ), '/'.join( pathComponents[ 4: ] )
+
+    def isPackagePath(self, pathComponents):
+        node = self.packageTree
+        for component in pathComponents:
+            if self.PACKAGE_END in node:
+                return True
+            node = node.get( component )
+            if node is None:
+                return False
+        return False
+
+
+class DiffAccumulator:
+    ''' Differences of the delta grouped by metadata type and status. Child elements are
+        added as a prefix ( the parent name ) and a name, the prefix is kept once per group
+        instead of in every apiname and the apinames are only joined, deduplicated and sorted
+        when they are written, so each group is a plain list. Type and status keys are
+        interned so every group shares the same key objects '''
+
+    __slots__ = ( 'entries', )
+
+    def __init__(self):
+        self.entries = {}
+
+    def __len__(self):
+        ''' Number of apinames added, duplicates included '''
+        return sum( len( names ) for statuses in self.entries.values()
+                    for prefixes in statuses.values() for names in prefixes.values() )
+
+    def add(self, xmlName, status, name, prefix=None):
+        self.getNames( xmlName, status, prefix ).append( name )
+
+    def addAll(self, xmlName, status, names, prefix=None):
+        self.getNames( xmlName, status, prefix ).extend( names )
+
+    def update(self, other):
+        ''' Adds every difference of other '''
+        for xmlName, statuses in other.entries.items():
+            for status, prefixes in statuses.items():
+                for prefix, names in prefixes.items():
+                    self.addAll( xmlName, status, names, prefix )
+
+    def getTypes(self):
+        return sorted( self.entries )
+
+    def getApinames(self, xmlName, *statuses):
+        ''' Sorted apinames of the type with any of the statuses '''
+        mapStatuses = self.entries.get( xmlName, {} )
+        return sorted( { formatApiname( prefix, name ) for status in statuses
+                         for prefix, names in mapStatuses.get( status, {} ).items() for name in names } )
+
+    def toDict(self):
+        return { xmlName : { status : self.getApinames( xmlName, status ) for status in statuses }
+                 for xmlName, statuses in self.entries.items() }
+
+    @classmethod
+    def fromDict(cls, mapDiffs):
+        accumulator = cls()
+        for xmlName, statuses in mapDiffs.items():
+            for status, apinames in statuses.items():
+                accumulator.addAll( xmlName, status, apinames )
+        return accumulator
+
+    def getNames(self, xmlName, status, prefix):
+        statuses = self.entries.get( xmlName )
+        if statuses is None:
+            statuses = self.entries[ intern( xmlName ) ] = {}
+        prefixes = statuses.get( status )
+        if prefixes is None:
+            prefixes = statuses[ intern( status ) ] = {}
+        names = prefixes.get( prefix )
+        if names is None:
+            names = prefixes[ prefix ] = []
+        return names
+
+
+def formatApiname(prefix, name):
+    return name if prefix is None else f'{prefix}.{name}'
+
+
 class ChangeType(enum.Enum):
     ''' Type of changes, git like '''
 
@@ -1,7 +1,15 @@
 import os
+import re
 from modules.utils import XMLNS, IDENTATION
 from modules.utils.exceptions import NoFullNameError
 
+PACKAGE_PATH            = 'package.xml'
+DESTRUCTIVE_POST_PATH   = 'destructiveChangesPost.xml'
+PACKAGE_HEADER          = '<?xml version="1.0" encoding="UTF-8"?>\n<Package xmlns="http://soap.sforce.com/2006/04/metadata">\n'
+
+XML_SPECIAL_CHARS = re.compile( '[&<>"\']' )
+XML_ESCAPE_TABLE  = str.maketrans( { '&' : '&amp;', '<' : '&lt;', '>' : '&gt;', '"' : '&quot;', '\'' : '&apos;' } )
+
 MAP_COMPOSED_FULLNAME = {
     'actionOverrides'	: { 'main' : 'actionName', 'secondary' : 'formFactor' },
     'layoutAssignments'	: { 'main' : 'layout', 'secondary' : 'recordType' }
@@ -45,7 +53,7 @@ def getFullName( tagName, childElement ):
 
 def searchFullNameTag( fullNameTag, childElement ):
     fullName = ''
-    for subChildElement in childElement.getchildren():
+    for subChildElement in childElement:
         tagName = subChildElement.tag.split( XMLNS )[ 1 ]
         if fullNameTag == tagName:
             fullName = subChildElement.text
@@ -61,7 +69,7 @@ def getComposedName( tagName, childElement ):
     mainName   = ''
     secondName = ''
 
-    for subChildElement in childElement.getchildren():
+    for subChildElement in childElement:
         tagName = subChildElement.tag.split( XMLNS )[ 1 ]
         if mainId == tagName:
             mainName = subChildElement.text
@@ -74,28 +82,43 @@ def getComposedName( tagName, childElement ):
 
 
 def xmlEncodeText( textValue ):
-    textValue = textValue.replace( "&", "&amp;" )
-    textValue = textValue.replace( "<", "&lt;" )
-    textValue = textValue.replace( ">", "&gt;" )
-    textValue = textValue.replace( "\"", "&quot;" )
-    textValue = textValue.replace( "'", "&apos;" )
+    # Most values have nothing to escape, the search is cheaper than translating them
+    if XML_SPECIAL_CHARS.search( textValue ):
+        return textValue.translate( XML_ESCAPE_TABLE )
     return textValue
 
 
-def generateDestructive(mapMetadata, apiVersion):
-    elementsData = ''
-    for metadataType in sorted( mapMetadata ):
-        if 'D' in mapMetadata[ metadataType ]:
-            elementsData += f'{IDENTATION}<types>\n'
-            for apiName in sorted( mapMetadata[ metadataType ][ 'D' ] ):
-                elementsData += f'{IDENTATION}{IDENTATION}<members>{apiName}</members>\n'
-            elementsData += f'{IDENTATION}{IDENTATION}<name>{metadataType}</name>\n'
-            elementsData += f'{IDENTATION}</types>\n'
-
-    if elementsData:
-        packageData = '<?xml version="1.0" encoding="UTF-8"?>\n<Package xmlns="http://soap.sforce.com/2006/04/metadata">\n'
-        packageData += elementsData
-        packageData += f'{IDENTATION}<version>{apiVersion}</version>\n</Package>'
-
-        with open( 'destructiveChangesPost.xml', 'w' ) as packageFile:
-            packageFile.write( packageData )
+def generateManifests(mapMetadata, apiVersion):
+    ''' Writes package.xml with the added and modified components and destructiveChangesPost.xml
+        with the deleted ones, walking the sorted types once. destructiveChangesPost.xml is only
+        written when something was deleted '''
+    destructiveFile = None
+    try:
+        with open( PACKAGE_PATH, 'w' ) as packageFile:
+            packageFile.write( PACKAGE_HEADER )
+            for metadataType in mapMetadata.getTypes():
+                writeTypeMembers( packageFile, metadataType, mapMetadata.getApinames( metadataType, 'A', 'M' ) )
+                apiNames = mapMetadata.getApinames( metadataType, 'D' )
+                if apiNames and not destructiveFile:
+                    destructiveFile = open( DESTRUCTIVE_POST_PATH, 'w' )
+                    destructiveFile.write( PACKAGE_HEADER )
+                writeTypeMembers( destructiveFile, metadataType, apiNames )
+            packageFile.write( getPackageFooter( apiVersion ) )
+            if destructiveFile:
+                destructiveFile.write( getPackageFooter( apiVersion ) )
+    finally:
+        if destructiveFile:
+            destructiveFile.close()
+
+
+def writeTypeMembers(packageFile, metadataType, apiNames):
+    if not apiNames:
+        return
+    packageFile.write( f'{IDENTATION}<types>\n' )
+    for apiName in apiNames:
+        packageFile.write( f'{IDENTATION}{IDENTATION}<members>{apiName}</members>\n' )
+    packageFile.write( f'{IDENTATION}{IDENTATION}<name>{metadataType}</name>\n{IDENTATION}</types>\n' )
+
+
+def getPackageFooter(apiVersion):
+    return f'{IDENTATION}<version>{apiVersion}</version>\n</Package>'
@@ -0,0 +1,102 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as elTree
+
+MERGER_PATH = os.path.join( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ), 'merger.py' )
+SOURCE_PATH = 'force-app/main/default'
+XMLNS       = '{http://soap.sforce.com/2006/04/metadata}'
+HEADER      = '<?xml version="1.0" encoding="UTF-8"?>\n'
+
+DESCRIBE = { 'metadataObjects' : [
+    { 'directoryName' : 'classes', 'inFolder' : False, 'metaFile' : True, 'suffix' : 'cls', 'xmlName' : 'ApexClass' },
+    { 'directoryName' : 'labels', 'inFolder' : False, 'metaFile' : False, 'suffix' : 'labels', 'xmlName' : 'CustomLabels', 'childXmlNames' : [ 'CustomLabel' ] },
+    { 'directoryName' : 'workflows', 'inFolder' : False, 'metaFile' : False, 'suffix' : 'workflow', 'xmlName' : 'Workflow', 'childXmlNames' : [ 'WorkflowAlert', 'WorkflowRule' ] }
+] }
+
+
+def getLabels(labels):
+    content = HEADER + '<CustomLabels xmlns="http://soap.sforce.com/2006/04/metadata">\n'
+    for fullName, value in labels:
+        content += f'    <labels>\n        <fullName>{fullName}</fullName>\n        <language>en_US</language>\n        <value>{value}</value>\n    </labels>\n'
+    return content + '</CustomLabels>\n'
+
+
+def getWorkflow(rules):
+    content = HEADER + '<Workflow xmlns="http://soap.sforce.com/2006/04/metadata">\n'
+    for fullName, active in rules:
+        content += f'    <rules>\n        <fullName>{fullName}</fullName>\n        <active>{active}</active>\n    </rules>\n'
+    return content + '</Workflow>\n'
+
+
+def getManifest(manifestPath):
+    ''' { type : [ members ] } of the manifest '''
+    rootElement = elTree.parse( manifestPath ).getroot()
+    return { typeElement.find( f'{XMLNS}name' ).text : [ member.text for member in typeElement.findall( f'{XMLNS}members' ) ]
+             for typeElement in rootElement.findall( f'{XMLNS}types' ) }
+
+
+class TestManifests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.mkdtemp()
+        cls.writeFile( 'describe.log', json.dumps( DESCRIBE ) )
+        cls.writeFile( 'sfdx-project.json', json.dumps( { 'packageDirectories' : [ { 'path' : 'force-app', 'default' : True } ] } ) )
+        cls.writeFile( f'{SOURCE_PATH}/classes/A.cls', 'public class A {}' )
+        cls.writeFile( f'{SOURCE_PATH}/classes/A.cls-meta.xml', HEADER + '<ApexClass/>' )
+        cls.writeFile( f'{SOURCE_PATH}/labels/CustomLabels.labels-meta.xml', getLabels( [ ( 'L1', 'one' ), ( 'L2', 'two' ), ( 'L3', 'three' ) ] ) )
+        cls.writeFile( f'{SOURCE_PATH}/workflows/Account.workflow-meta.xml', getWorkflow( [ ( 'Rule1', 'true' ), ( 'Rule2', 'true' ) ] ) )
+        cls.git( 'init', '-q' )
+        cls.git( 'add', '-A' )
+        cls.git( '-c', 'user.name=test', '-c', 'user.email=test@test', 'commit', '-q', '-m', 'base' )
+        cls.git( 'tag', 'base' )
+
+        cls.writeFile( f'{SOURCE_PATH}/classes/A.cls', 'public class A { void run(){} }' )
+        cls.writeFile( f'{SOURCE_PATH}/labels/CustomLabels.labels-meta.xml', getLabels( [ ( 'L1', 'changed' ), ( 'L2', 'two' ), ( 'L4', 'four' ) ] ) )
+        cls.writeFile( f'{SOURCE_PATH}/workflows/Account.workflow-meta.xml', getWorkflow( [ ( 'Rule1', 'false' ), ( 'Rule3', 'true' ) ] ) )
+        cls.git( 'add', '-A' )
+        cls.git( '-c', 'user.name=test', '-c', 'user.email=test@test', 'commit', '-q', '-m', 'change' )
+        cls.git( 'tag', 'head' )
+
+        subprocess.run( [ sys.executable, MERGER_PATH, 'build_delta', '-s', 'head', '-t', 'base', '-a', '50.0', '-nf' ],
+                        cwd=cls.folder, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree( cls.folder )
+
+    @classmethod
+    def writeFile(cls, filePath, content):
+        filePath = os.path.join( cls.folder, filePath )
+        os.makedirs( os.path.dirname( filePath ), exist_ok=True )
+        with open( filePath, 'w', encoding='utf-8' ) as fileToWrite:
+            fileToWrite.write( content )
+
+    @classmethod
+    def git(cls, *args):
+        subprocess.run( [ 'git' ] + list( args ), cwd=cls.folder, stdout=subprocess.DEVNULL, check=True )
+
+    def testPackage(self):
+        self.assertEqual( getManifest( os.path.join( self.folder, 'package.xml' ) ), {
+            'ApexClass'     : [ 'A' ],
+            'CustomLabel'   : [ 'L1', 'L4' ],
+            'WorkflowRule'  : [ 'Account.Rule1', 'Account.Rule3' ]
+        } )
+
+    def testDestructiveChangesPost(self):
+        self.assertEqual( getManifest( os.path.join( self.folder, 'destructiveChangesPost.xml' ) ), {
+            'CustomLabel'   : [ 'L3' ],
+            'WorkflowRule'  : [ 'Account.Rule2' ]
+        } )
+
+    def testNoDestructiveChanges(self):
+        self.assertFalse( os.path.exists( os.path.join( self.folder, 'destructiveChanges.xml' ) ) )
+
+
+if __name__ == '__main__':
+    unittest.main()